@@ -9,6 +9,7 @@ from fastapi.staticfiles import StaticFiles
 from fastapi.templating import Jinja2Templates
 from pydantic import BaseModel
 from typing import List, Optional
+import asyncio
 import threading
 import re
 import os
@@ -71,9 +72,20 @@ from database import (
     get_public_deck_items,
     # Migration
     migrate_to_multiuser,
+    # Background maintenance
+    start_maintenance_thread,
 )
 from scraper import scrape_keyword, scrape_all_keywords, generate_mock_items, save_scraped_items
-from email_service import send_magic_link, send_invite_confirmation
+from email_service import send_magic_link_async, send_magic_links_bulk, send_invite_confirmation, EmailBacklogError
+
+
+def _queue_magic_link(email: str, token: str, link_type: str = 'login'):
+    """Queue a magic link send; 503 if the email backlog is full."""
+    try:
+        send_magic_link_async(email, token, link_type)
+    except EmailBacklogError:
+        raise HTTPException(status_code=503, detail="Email service busy. Try again in a minute.")
+
 
 # Optional ML dependencies (not available on Railway due to size)
 try:
@@ -192,6 +204,9 @@ def queue_detail_scrape(item: dict):
 async def startup():
     init_db()
 
+    # Periodic WAL truncation so burst scrapes don't degrade read latency
+    start_maintenance_thread()
+
     # One-time cleanup: delete unseen Rakuten items with placeholder images
     # This runs on startup to clean up items scraped with the buggy scraper
     try:
@@ -291,6 +306,10 @@ class InviteRequest(BaseModel):
     reason: Optional[str] = None
 
 
+class BulkInviteApprove(BaseModel):
+    request_ids: List[int]
+
+
 class DeckShareUpdate(BaseModel):
     is_public: bool
 
@@ -307,7 +326,7 @@ async def request_login(request: LoginRequest):
         raise HTTPException(status_code=404, detail="No account found. Request an invite first.")
 
     token = create_magic_link(request.email)
-    send_magic_link(request.email, token, 'login')
+    _queue_magic_link(request.email, token, 'login')
     return {"status": "ok", "message": "Check your email for a login link"}
 
 
@@ -396,13 +415,13 @@ async def request_invite(request: InviteRequest):
         if existing['status'] == 'approved':
             # Re-send magic link
             token = create_magic_link(email, 'invite')
-            send_magic_link(email, token, 'invite')
+            _queue_magic_link(email, token, 'invite')
             return {"status": "ok", "message": "Check your email for a sign-in link!"}
         elif existing['status'] == 'pending':
             # Auto-approve and send link
             approve_invite_request(existing['id'], approved_by=None)
             token = create_magic_link(email, 'invite')
-            send_magic_link(email, token, 'invite')
+            _queue_magic_link(email, token, 'invite')
             return {"status": "ok", "message": "Check your email for a sign-in link!"}
 
     # Create invite request
@@ -413,7 +432,7 @@ async def request_invite(request: InviteRequest):
     # Auto-approve and send magic link immediately
     approve_invite_request(request_id, approved_by=None)
     token = create_magic_link(email, 'invite')
-    send_magic_link(email, token, 'invite')
+    _queue_magic_link(email, token, 'invite')
     return {"status": "ok", "message": "Check your email for a sign-in link!"}
 
 
@@ -439,11 +458,36 @@ async def approve_invite_endpoint(request_id: int, user: dict = Depends(get_curr
 
     # Send magic link
     token = create_magic_link(email, 'invite')
-    send_magic_link(email, token, 'invite')
+    _queue_magic_link(email, token, 'invite')
 
     return {"status": "ok", "email": email}
 
 
+@app.post("/api/invite/approve")
+async def approve_invites_bulk(request: BulkInviteApprove, user: dict = Depends(get_current_user)):
+    """Approve several invite requests at once (admin only - user #1).
+
+    Magic links go out through the batch email endpoint - one API
+    round-trip per 100 approvals instead of one per invite.
+    """
+    if user['id'] != 1:
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    recipients = []
+    approved = []
+    for request_id in request.request_ids:
+        email = approve_invite_request(request_id, user['id'])
+        if email:
+            recipients.append((email, create_magic_link(email, 'invite'), 'invite'))
+            approved.append(email)
+
+    if recipients:
+        await asyncio.to_thread(send_magic_links_bulk, recipients)
+
+    return {"status": "ok", "approved": approved,
+            "skipped": len(request.request_ids) - len(approved)}
+
+
 # =====================================================
 # DECK SHARING ENDPOINTS
 # =====================================================
@@ -0,0 +1,44 @@
+"""
+Pure-python Bloom filter for scrape overlap detection.
+
+Answers "probably seen before" in O(1) with ~10 bits per id instead of
+materializing every historical source_id into a Python set. False
+positives are tolerable for the scrapers: at worst one new item is
+miscounted as an overlap and skipped.
+"""
+
+import math
+from hashlib import blake2b
+
+
+class BloomFilter:
+    """Fixed-size bit array sized for `capacity` items at `error_rate`."""
+
+    def __init__(self, capacity: int, error_rate: float = 0.001):
+        capacity = max(1, capacity)
+        # Standard sizing: m = -n*ln(p) / ln(2)^2, k = (m/n) * ln(2)
+        self.num_bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.num_hashes = max(1, round(self.num_bits / capacity * math.log(2)))
+        self.bits = bytearray((self.num_bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item: str):
+        # Double hashing: two 64-bit halves of one blake2b digest generate
+        # all k indexes without k separate hash calls
+        digest = blake2b(item.encode(), digest_size=16).digest()
+        h1 = int.from_bytes(digest[:8], 'big')
+        h2 = int.from_bytes(digest[8:], 'big') | 1
+        for i in range(self.num_hashes):
+            yield (h1 + i * h2) % self.num_bits
+
+    def add(self, item: str):
+        for pos in self._positions(item):
+            self.bits[pos >> 3] |= 1 << (pos & 7)
+        self.count += 1
+
+    def __contains__(self, item: str) -> bool:
+        return all(self.bits[pos >> 3] & (1 << (pos & 7))
+                   for pos in self._positions(item))
+
+    def __len__(self) -> int:
+        return self.count
@@ -4,9 +4,16 @@ Uses SQLite with fresh schema for items and keywords.
 Multi-user support with magic link authentication.
 """
 
+import atexit
+import functools
+import json
 import sqlite3
 import secrets
 import os
+import queue
+import threading
+import time
+from contextlib import contextmanager
 from pathlib import Path
 from datetime import datetime, timedelta
 from typing import Optional, List
@@ -17,17 +24,310 @@ DB_PATH = Path(os.environ.get('DATABASE_PATH', Path(__file__).parent / "shopping
 # Magic link validity (24 hours)
 MAGIC_LINK_VALIDITY_HOURS = 24
 
+# Hot-path SQL pinned as module constants: the exact same string object is
+# passed to execute() every call, so sqlite3's per-connection statement cache
+# reuses the prepared statement instead of re-parsing.
+_SQL_GET_ITEM = """
+    SELECT i.*, d.description, d.images
+    FROM items i
+    LEFT JOIN item_details d ON d.item_id = i.id
+    WHERE i.id = ?
+"""
+_SQL_SAVE_ITEM = "UPDATE items SET saved = TRUE, seen = TRUE WHERE id = ?"
+_SQL_SAVE_ITEM_RETURNING = "UPDATE items SET saved = TRUE, seen = TRUE WHERE id = ? RETURNING *"
+_SQL_GET_ITEM_DETAILS = "SELECT description, images FROM item_details WHERE item_id = ?"
+_SQL_MARK_SEEN = "UPDATE items SET seen = TRUE WHERE id = ?"
+_SQL_UNSAVE_ITEM = "UPDATE items SET saved = FALSE, stars = NULL WHERE id = ?"
+_SQL_RATE_ITEM = "UPDATE items SET stars = ? WHERE id = ?"
+_SQL_SET_ITEM_CART = "UPDATE items SET in_cart = ? WHERE id = ?"
+_SQL_UPDATE_FIT_SCORE = "UPDATE items SET fit_score = ? WHERE id = ?"
+
 
 def get_connection():
-    """Get a database connection with row factory."""
-    conn = sqlite3.connect(DB_PATH)
+    """Get a database connection with row factory.
+
+    Legacy entry point kept for callers outside this module. Instead of
+    opening a fresh connection per call (file open, schema lookup, pragma
+    replay every time), it now hands out the shared long-lived writer
+    connection; close() releases it back rather than closing.
+    """
+    return get_write_connection()
+
+
+# =====================================================
+# CONNECTION POOLS
+# =====================================================
+# SQLite allows many concurrent readers but only one writer. Instead of
+# opening a fresh connection per call, reads borrow from a small pool of
+# query_only connections and all writes share a single connection guarded
+# by a lock, so readers never contend with each other or with write pages.
+
+_READER_POOL_SIZE = 4
+
+_reader_pool = None
+_writer_conn = None
+_writer_lock = threading.Lock()
+_init_lock = threading.Lock()
+
+
+class _PooledConnection:
+    """Thin proxy around a pooled sqlite3 connection.
+
+    close() hands the connection back (readers) or releases the writer lock
+    (writer) instead of actually closing, so the call-site pattern
+    `conn = ...; conn.close()` used throughout this module keeps working.
+    """
+
+    def __init__(self, conn, release):
+        self._conn = conn
+        self._release = release
+
+    def close(self):
+        release, self._release = self._release, None
+        if release:
+            release(self._conn)
+
+    def __getattr__(self, name):
+        return getattr(self._conn, name)
+
+    def __del__(self):
+        # Safety net: if an exception skipped a call site's conn.close(),
+        # release on garbage collection rather than wedging the pool
+        self.close()
+
+
+def _open_connection(query_only=False):
+    """Open a raw connection configured for pooled, cross-thread use."""
+    # cached_statements=256 (default 128) keeps every hot statement's
+    # prepared form alive on the long-lived pooled connections, so repeated
+    # single-row lookups skip the SQL parse entirely
+    conn = sqlite3.connect(DB_PATH, cached_statements=256, check_same_thread=False)
     conn.row_factory = sqlite3.Row
+    # WAL: commits append to the log instead of rewriting pages with a full
+    # fsync each time, and readers no longer block the writer (or vice
+    # versa). synchronous=NORMAL skips the per-commit fsync, which WAL makes
+    # safe against application crashes.
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    conn.execute("PRAGMA wal_autocheckpoint = 1000")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    conn.execute("PRAGMA cache_size = -65536")
+    conn.execute("PRAGMA mmap_size = 268435456")
+    if query_only:
+        conn.execute("PRAGMA query_only = 1")
     return conn
 
 
+def _get_reader_pool():
+    global _reader_pool
+    if _reader_pool is None:
+        with _init_lock:
+            if _reader_pool is None:
+                pool = queue.Queue(maxsize=_READER_POOL_SIZE)
+                for _ in range(_READER_POOL_SIZE):
+                    pool.put(_open_connection(query_only=True))
+                _reader_pool = pool
+    return _reader_pool
+
+
+def get_read_connection():
+    """Borrow a read-only connection from the reader pool."""
+    pool = _get_reader_pool()
+    return _PooledConnection(pool.get(), pool.put)
+
+
+def get_write_connection():
+    """Acquire the shared writer connection (exclusive until close())."""
+    global _writer_conn
+    _writer_lock.acquire()
+    if _writer_conn is None:
+        _writer_conn = _open_connection()
+    return _PooledConnection(_writer_conn, lambda conn: _writer_lock.release())
+
+
+@contextmanager
+def borrow_read():
+    """Context-manager form of get_read_connection()."""
+    conn = get_read_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+@contextmanager
+def borrow_write():
+    """Context-manager form of get_write_connection()."""
+    conn = get_write_connection()
+    try:
+        yield conn
+    finally:
+        conn.close()
+
+
+def close_connections():
+    """Close pooled connections (tests / shutdown)."""
+    global _reader_pool, _writer_conn
+    with _init_lock:
+        if _reader_pool is not None:
+            while not _reader_pool.empty():
+                _reader_pool.get_nowait().close()
+            _reader_pool = None
+    with _writer_lock:
+        if _writer_conn is not None:
+            _writer_conn.close()
+            _writer_conn = None
+
+
+atexit.register(close_connections)
+
+
+def run_maintenance():
+    """One round of low-priority database upkeep.
+
+    Purges consumed/expired magic links and stale sessions so the auth
+    token B-trees stay sized to the active working set, then truncates
+    the WAL file so burst writes don't leave a large log for every
+    subsequent read to scan (autocheckpoint only restarts the WAL, it
+    never shrinks the file).
+    """
+    conn = get_write_connection()
+    try:
+        conn.execute(
+            "DELETE FROM magic_links WHERE used_at IS NOT NULL OR expires_at < ?",
+            (int(time.time()),)
+        )
+        conn.execute("DELETE FROM sessions WHERE created_at < datetime('now', '-30 days')")
+        conn.commit()
+        conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+    finally:
+        conn.close()
+
+
+def start_maintenance_thread(interval_seconds: int = 900):
+    """Run run_maintenance() every interval_seconds in a daemon thread."""
+    def _loop():
+        while True:
+            time.sleep(interval_seconds)
+            try:
+                run_maintenance()
+            except Exception as e:
+                print(f"[Maintenance] Error: {e}")
+
+    thread = threading.Thread(target=_loop, daemon=True, name="db-maintenance")
+    thread.start()
+    return thread
+
+
+def _iter_dicts(cursor):
+    """Yield rows as dicts while the cursor streams, instead of materializing
+    the whole result set with fetchall() before the caller sees anything.
+
+    Callers need plain dicts (templates and JSON responses use .get()), so
+    rather than returning sqlite3.Row we skip Row construction entirely:
+    fetch raw tuples and zip them against one shared column list.
+    """
+    columns = [d[0] for d in cursor.description]
+    cursor.row_factory = None
+    for row in cursor:
+        yield dict(zip(columns, row))
+
+
+def _stream_dicts(conn, cursor):
+    """Like _iter_dicts, but owns the connection: closes it once the
+    iterator is exhausted (or the generator is discarded)."""
+    try:
+        yield from _iter_dicts(cursor)
+    finally:
+        conn.close()
+
+
+def _migrate_strict_tables(cursor):
+    """Rebuild narrow lookup tables created before STRICT/WITHOUT ROWID was adopted.
+
+    Copies rows via INSERT INTO new SELECT ... FROM old, then swaps the tables.
+    No-op for tables already declared STRICT (including fresh databases).
+    """
+    rebuilds = {
+        'categories': (
+            """CREATE TABLE categories_new (
+                id TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                name TEXT,
+                name_en TEXT,
+                parent_id TEXT,
+                path TEXT
+            ) WITHOUT ROWID, STRICT""",
+            "id, source, name, name_en, parent_id, path"),
+        'keyword_whitelist': (
+            """CREATE TABLE keyword_whitelist_new (
+                keyword_id INTEGER NOT NULL,
+                category_id TEXT NOT NULL,
+                PRIMARY KEY (keyword_id, category_id)
+            ) WITHOUT ROWID, STRICT""",
+            "keyword_id, category_id"),
+        'sessions': (
+            """CREATE TABLE sessions_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                user_id INTEGER NOT NULL,
+                token TEXT NOT NULL UNIQUE,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
+            ) STRICT""",
+            "id, user_id, token, created_at"),
+        'magic_links': (
+            """CREATE TABLE magic_links_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                email TEXT NOT NULL,
+                token TEXT NOT NULL UNIQUE,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                expires_at INTEGER NOT NULL,
+                used_at TEXT,
+                link_type TEXT DEFAULT 'login'
+            ) STRICT""",
+            "id, email, token, created_at, expires_at, used_at, link_type",
+            # Old rows stored expires_at as an ISO string; convert to epoch
+            "id, email, token, created_at, CAST(strftime('%s', expires_at) AS INTEGER), used_at, link_type"),
+        'deck_shares': (
+            """CREATE TABLE deck_shares_new (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                deck_id INTEGER NOT NULL UNIQUE,
+                share_slug TEXT NOT NULL,
+                is_public INTEGER DEFAULT 0,
+                created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                FOREIGN KEY (deck_id) REFERENCES decks(id) ON DELETE CASCADE
+            ) STRICT""",
+            "id, deck_id, share_slug, is_public, created_at"),
+    }
+
+    for table, (create_sql, columns, *select_override) in rebuilds.items():
+        cursor.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?",
+            (table,)
+        )
+        row = cursor.fetchone()
+        if not row:
+            continue
+        old_sql = row['sql'] or ''
+        # magic_links also gets rebuilt when expires_at is still TEXT
+        # (STRICT databases from before the epoch-integer switch)
+        up_to_date = 'STRICT' in old_sql
+        if table == 'magic_links' and 'expires_at INTEGER' not in old_sql:
+            up_to_date = False
+        if up_to_date:
+            continue
+
+        select_cols = select_override[0] if select_override else columns
+        cursor.execute(f"DROP TABLE IF EXISTS {table}_new")
+        cursor.execute(create_sql)
+        cursor.execute(f"INSERT INTO {table}_new ({columns}) SELECT {select_cols} FROM {table}")
+        cursor.execute(f"DROP TABLE {table}")
+        cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+
+
 def init_db():
     """Initialize the database with fresh schema."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     # Decks table - folders for keywords with sizing profiles
@@ -80,7 +380,9 @@ def init_db():
     if 'deck_id' not in columns:
         cursor.execute("ALTER TABLE keywords ADD COLUMN deck_id INTEGER REFERENCES decks(id)")
 
-    # Items table - scraped marketplace items
+    # Items table - scraped marketplace items.
+    # Bulky detail columns (description, images JSON) live in item_details so
+    # the hot list queries read short rows that pack densely into pages.
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS items (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -89,8 +391,6 @@ def init_db():
             title TEXT,
             price INTEGER,
             image_url TEXT,
-            images TEXT,
-            description TEXT,
             url TEXT,
             scraped_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
             seen BOOLEAN DEFAULT FALSE,
@@ -118,6 +418,13 @@ def init_db():
     if 'fit_score' not in item_columns:
         cursor.execute("ALTER TABLE items ADD COLUMN fit_score INTEGER DEFAULT NULL")
 
+    # Migration: Track detail-scrape failures so doomed items stop
+    # re-entering every batch
+    if 'scrape_attempts' not in item_columns:
+        cursor.execute("ALTER TABLE items ADD COLUMN scrape_attempts INTEGER DEFAULT 0")
+    if 'last_scrape_at' not in item_columns:
+        cursor.execute("ALTER TABLE items ADD COLUMN last_scrape_at TIMESTAMP")
+
     # Migration: Add category_id column if it doesn't exist
     if 'category_id' not in item_columns:
         cursor.execute("ALTER TABLE items ADD COLUMN category_id TEXT")
@@ -130,7 +437,37 @@ def init_db():
     if 'in_cart' not in item_columns:
         cursor.execute("ALTER TABLE items ADD COLUMN in_cart BOOLEAN DEFAULT FALSE")
 
-    # Category hierarchy cache (populated on-demand)
+    # Side table for bulky item detail columns, keyed by item id
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS item_details (
+            item_id INTEGER PRIMARY KEY,
+            description TEXT,
+            images TEXT
+        ) WITHOUT ROWID, STRICT
+    """)
+
+    # Migration: move description/images off pre-existing items rows
+    if 'description' in item_columns:
+        cursor.execute("""
+            INSERT OR REPLACE INTO item_details (item_id, description, images)
+            SELECT id, description, images FROM items
+            WHERE description IS NOT NULL OR images IS NOT NULL
+        """)
+        cursor.execute("ALTER TABLE items DROP COLUMN description")
+        cursor.execute("ALTER TABLE items DROP COLUMN images")
+
+    # Migration: Denormalized copy of keywords.priority so the reroll query
+    # doesn't need to join keywords/decks on every call. Backfill from keywords.
+    if 'keyword_priority' not in item_columns:
+        cursor.execute("ALTER TABLE items ADD COLUMN keyword_priority INTEGER DEFAULT 0")
+        cursor.execute("""
+            UPDATE items SET keyword_priority = COALESCE(
+                (SELECT priority FROM keywords WHERE keywords.id = items.keyword_id), 0)
+        """)
+
+    # Category hierarchy cache (populated on-demand).
+    # WITHOUT ROWID: rows live directly in the primary-key B-tree - one less
+    # indirection for these tiny key-accessed rows. STRICT enforces types.
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS categories (
             id TEXT PRIMARY KEY,
@@ -139,7 +476,21 @@ def init_db():
             name_en TEXT,
             parent_id TEXT,
             path TEXT
-        )
+        ) WITHOUT ROWID, STRICT
+    """)
+
+    # Transitive closure of the category tree: one row per
+    # (ancestor, descendant) pair including self at depth 0. Turns every
+    # ancestor/descendant traversal into a single indexed lookup.
+    # Maintained by add_category; categories never re-parent (fixed
+    # marketplace taxonomies), so rows are only ever added.
+    cursor.execute("""
+        CREATE TABLE IF NOT EXISTS category_closure (
+            ancestor TEXT NOT NULL,
+            descendant TEXT NOT NULL,
+            depth INTEGER NOT NULL,
+            PRIMARY KEY (ancestor, descendant)
+        ) WITHOUT ROWID, STRICT
     """)
 
     # Whitelist: categories TO show (per keyword, set during creation)
@@ -147,9 +498,8 @@ def init_db():
         CREATE TABLE IF NOT EXISTS keyword_whitelist (
             keyword_id INTEGER NOT NULL,
             category_id TEXT NOT NULL,
-            PRIMARY KEY (keyword_id, category_id),
-            FOREIGN KEY (keyword_id) REFERENCES keywords(id)
-        )
+            PRIMARY KEY (keyword_id, category_id)
+        ) WITHOUT ROWID, STRICT
     """)
 
     # Blocklist: categories NOT to show
@@ -178,28 +528,31 @@ def init_db():
         )
     """)
 
-    # Sessions table (unlimited sessions per user)
+    # Sessions table (unlimited sessions per user).
+    # STRICT tables (here and below) need conforming type names, so the
+    # TIMESTAMP/BOOLEAN affinities become TEXT/INTEGER.
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS sessions (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             user_id INTEGER NOT NULL,
             token TEXT NOT NULL UNIQUE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (user_id) REFERENCES users(id) ON DELETE CASCADE
-        )
+        ) STRICT
     """)
 
-    # Magic links table (24h validity)
+    # Magic links table (24h validity; expires_at is unix seconds so the
+    # expiry check stays in SQL)
     cursor.execute("""
         CREATE TABLE IF NOT EXISTS magic_links (
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             email TEXT NOT NULL,
             token TEXT NOT NULL UNIQUE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
-            expires_at TIMESTAMP NOT NULL,
-            used_at TIMESTAMP,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+            expires_at INTEGER NOT NULL,
+            used_at TEXT,
             link_type TEXT DEFAULT 'login'
-        )
+        ) STRICT
     """)
 
     # Invite requests table
@@ -221,12 +574,17 @@ def init_db():
             id INTEGER PRIMARY KEY AUTOINCREMENT,
             deck_id INTEGER NOT NULL UNIQUE,
             share_slug TEXT NOT NULL,
-            is_public BOOLEAN DEFAULT FALSE,
-            created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+            is_public INTEGER DEFAULT 0,
+            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
             FOREIGN KEY (deck_id) REFERENCES decks(id) ON DELETE CASCADE
-        )
+        ) STRICT
     """)
 
+    # Migration: rebuild pre-existing narrow lookup tables as STRICT
+    # (and WITHOUT ROWID where keyed directly). Gated on the stored schema
+    # so it only runs once per database.
+    _migrate_strict_tables(cursor)
+
     # =====================================================
     # MULTI-USER COLUMN MIGRATIONS
     # =====================================================
@@ -269,13 +627,58 @@ def init_db():
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_blocklist_keyword ON category_blocklist(keyword_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_items_hidden ON items(hidden)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_items_cart ON items(in_cart)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_categories_parent ON categories(parent_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_items_category_seen_saved ON items(category_id, seen, saved)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_kw_whitelist_kw ON keyword_whitelist(keyword_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_closure_descendant ON category_closure(descendant)")
+    # Backfill the closure from the cached category tree; OR IGNORE makes
+    # this a no-op once the rows exist
+    cursor.execute("""
+        INSERT OR IGNORE INTO category_closure (ancestor, descendant, depth)
+        WITH RECURSIVE cc(ancestor, descendant, depth) AS (
+            SELECT id, id, 0 FROM categories
+            UNION ALL
+            SELECT c.parent_id, cc.descendant, cc.depth + 1
+            FROM categories c JOIN cc ON c.id = cc.ancestor
+            WHERE c.parent_id IS NOT NULL AND cc.depth < 10
+        )
+        SELECT ancestor, descendant, depth FROM cc
+    """)
+    # Partial index backing the denormalized reroll query (unseen partition only)
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_items_reroll_denorm
+        ON items(keyword_priority DESC, scraped_at DESC)
+        WHERE seen = 0 AND saved = 0
+    """)
+    # Partial index for per-keyword unseen counts: counting becomes an
+    # index-range scan over the (small) unseen partition only
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_items_unseen_by_kw
+        ON items(keyword_id)
+        WHERE seen = 0 AND saved = 0 AND (hidden = 0 OR hidden IS NULL)
+    """)
 
     # Multi-user indexes
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_token ON sessions(token)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_sessions_user ON sessions(user_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_magic_links_token ON magic_links(token)")
+    # Verification only ever probes unconsumed links, so keep a partial
+    # index over just the active working set
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_magic_active
+        ON magic_links(token) WHERE used_at IS NULL
+    """)
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_magic_links_email ON magic_links(email)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_invite_requests_status ON invite_requests(status)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_items_keyword_saved_user ON items(keyword_id, saved, user_id)")
+    # Expression index matching the public-deck sort key ((stars IS NULL)
+    # mirrors NULLS LAST), so the per-keyword scan comes back pre-ordered
+    cursor.execute("""
+        CREATE INDEX IF NOT EXISTS idx_items_deck_sort
+        ON items(keyword_id, saved, user_id, (stars IS NULL), stars DESC, scraped_at DESC)
+    """)
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_invite_status_created ON invite_requests(status, created_at)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS idx_blocklist_catkw ON category_blocklist(category_id, keyword_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_deck_shares_slug ON deck_shares(share_slug)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_decks_user ON decks(user_id)")
     cursor.execute("CREATE INDEX IF NOT EXISTS idx_keywords_user ON keywords(user_id)")
@@ -295,33 +698,69 @@ def init_db():
     print(f"Database initialized at {DB_PATH}")
 
 
+# In-process cache of keyword display info (keyword name, deck id/name) keyed by
+# keyword id. The reroll query reads the denormalized items.keyword_priority
+# column instead of joining keywords/decks; display names come from here.
+_keyword_info_cache = {}
+
+
+def _invalidate_keyword_cache():
+    """Drop the keyword display cache after keyword/deck mutations."""
+    _keyword_info_cache.clear()
+
+
+def _get_keyword_info(keyword_id: int) -> dict:
+    """Get {keyword_name, deck_id, deck_name} for a keyword, cached in-process."""
+    if keyword_id is None:
+        return {'keyword_name': None, 'deck_id': None, 'deck_name': None}
+
+    info = _keyword_info_cache.get(keyword_id)
+    if info is None:
+        conn = get_read_connection()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT k.keyword as keyword_name, k.deck_id, d.name as deck_name
+            FROM keywords k
+            LEFT JOIN decks d ON k.deck_id = d.id
+            WHERE k.id = ?
+        """, (keyword_id,))
+        row = cursor.fetchone()
+        conn.close()
+        info = dict(row) if row else {'keyword_name': None, 'deck_id': None, 'deck_name': None}
+        _keyword_info_cache[keyword_id] = info
+    return info
+
+
 def get_next_unseen(count: int = 5, exclude_ids: List[int] = None) -> List[dict]:
     """Get next N unseen, unsaved, unhidden items for the reroll view, ordered by keyword priority."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
-    # Build query with optional exclusion for preloading
+    # Optional exclusion for preloading: the id list is bound as one JSON
+    # array via json_each, so the statement text (and with it the prepared
+    # statement) stays identical for any list length
     exclude_clause = ""
     params = []
     if exclude_ids:
-        placeholders = ','.join('?' * len(exclude_ids))
-        exclude_clause = f" AND i.id NOT IN ({placeholders})"
-        params.extend(exclude_ids)
+        exclude_clause = " AND id NOT IN (SELECT value FROM json_each(?))"
+        params.append(json.dumps(list(exclude_ids)))
     params.append(count)
 
+    # No JOIN here: keyword_priority is denormalized onto items and display
+    # names are resolved from the in-process keyword cache below.
     cursor.execute(f"""
-        SELECT i.id, i.source, i.source_id, i.title, i.price, i.image_url, i.url,
-               i.saved, i.stars, i.keyword_id, i.category_id,
-               k.keyword as keyword_name, k.deck_id, d.name as deck_name
-        FROM items i
-        LEFT JOIN keywords k ON i.keyword_id = k.id
-        LEFT JOIN decks d ON k.deck_id = d.id
-        WHERE i.seen = FALSE AND i.saved = FALSE AND (i.hidden = FALSE OR i.hidden IS NULL){exclude_clause}
-        ORDER BY COALESCE(k.priority, 0) DESC, i.scraped_at DESC
+        SELECT id, source, source_id, title, price, image_url, url,
+               saved, stars, keyword_id, category_id
+        FROM items
+        WHERE seen = 0 AND saved = 0 AND (hidden = 0 OR hidden IS NULL){exclude_clause}
+        ORDER BY keyword_priority DESC, scraped_at DESC
         LIMIT ?
     """, params)
-    items = [dict(row) for row in cursor.fetchall()]
+    items = list(_iter_dicts(cursor))
     conn.close()
+
+    for item in items:
+        item.update(_get_keyword_info(item['keyword_id']))
     return items
 
 
@@ -329,41 +768,58 @@ def mark_seen(item_ids: List[int]):
     """Mark items as seen."""
     if not item_ids:
         return
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
-    placeholders = ','.join('?' * len(item_ids))
-    cursor.execute(f"""
-        UPDATE items SET seen = TRUE
-        WHERE id IN ({placeholders})
-    """, item_ids)
+    # executemany reuses one prepared statement for any batch size, instead
+    # of interpolating a fresh IN (?,?,...) string per call
+    cursor.executemany(_SQL_MARK_SEEN, [(item_id,) for item_id in item_ids])
 
     conn.commit()
     conn.close()
 
 
+# UPDATE ... RETURNING needs SQLite >= 3.35 (2021); fall back to the
+# two-statement version on older library builds
+_HAS_RETURNING = sqlite3.sqlite_version_info >= (3, 35)
+
+
 def save_item(item_id: int) -> dict:
     """Mark item as saved (add to deck). Also marks as seen."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
-    cursor.execute("UPDATE items SET saved = TRUE, seen = TRUE WHERE id = ?", (item_id,))
-    conn.commit()
+    if _HAS_RETURNING:
+        # One statement, one B-tree lookup: returns the post-update row.
+        # description/images moved to item_details, so a second point
+        # lookup joins them back - both branches return the same shape
+        cursor.execute(_SQL_SAVE_ITEM_RETURNING, (item_id,))
+        row = cursor.fetchone()
+        conn.commit()
+        item = dict(row) if row else None
+        if item is not None:
+            cursor.execute(_SQL_GET_ITEM_DETAILS, (item_id,))
+            details = cursor.fetchone()
+            item['description'] = details['description'] if details else None
+            item['images'] = details['images'] if details else None
+    else:
+        cursor.execute(_SQL_SAVE_ITEM, (item_id,))
+        conn.commit()
+        cursor.execute(_SQL_GET_ITEM, (item_id,))
+        row = cursor.fetchone()
+        item = dict(row) if row else None
 
-    cursor.execute("SELECT * FROM items WHERE id = ?", (item_id,))
-    row = cursor.fetchone()
-    item = dict(row) if row else None
     conn.close()
     return item
 
 
 def unsave_item(item_id: int):
     """Remove item from deck. Keeps seen=TRUE so it won't reappear in reroll."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     # Only set saved=FALSE, keep seen=TRUE so it doesn't come back to reroll
-    cursor.execute("UPDATE items SET saved = FALSE, stars = NULL WHERE id = ?", (item_id,))
+    cursor.execute(_SQL_UNSAVE_ITEM, (item_id,))
     conn.commit()
     conn.close()
 
@@ -373,27 +829,65 @@ def rate_item(item_id: int, stars: int):
     if stars < 1 or stars > 5:
         raise ValueError("Stars must be 1-5")
 
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
-    cursor.execute("UPDATE items SET stars = ? WHERE id = ?", (stars, item_id))
+    cursor.execute(_SQL_RATE_ITEM, (stars, item_id))
     conn.commit()
     conn.close()
 
 
 def set_item_cart(item_id: int, in_cart: bool):
     """Set an item's cart status."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
-    cursor.execute("UPDATE items SET in_cart = ? WHERE id = ?", (1 if in_cart else 0, item_id))
+    cursor.execute(_SQL_SET_ITEM_CART, (1 if in_cart else 0, item_id))
     conn.commit()
     conn.close()
 
 
+@functools.lru_cache(maxsize=128)
+def _build_saved_sql(has_source, has_cart, has_stars, has_deck, has_keyword,
+                     sort_col, order_dir):
+    """Build the saved-items SQL for one filter shape.
+
+    Cached per shape so repeated calls reuse the identical string (and with
+    it sqlite3's prepared statement) instead of re-concatenating and
+    re-parsing; values are always bound via ? placeholders.
+    """
+    query = """
+        SELECT i.*, k.keyword as keyword_name, k.deck_id, d.name as deck_name
+        FROM items i
+        LEFT JOIN keywords k ON i.keyword_id = k.id
+        LEFT JOIN decks d ON k.deck_id = d.id
+        WHERE i.saved = TRUE
+    """
+    if has_source:
+        query += " AND i.source = ?"
+    # Additive filters (all conditions are ANDed together)
+    if has_cart:
+        query += " AND i.in_cart = TRUE"
+    if has_stars:
+        # JSON-array parameter keeps one statement shape for any star count
+        query += " AND i.stars IN (SELECT value FROM json_each(?))"
+    if has_deck:
+        query += " AND k.deck_id = ?"
+    if has_keyword:
+        query += " AND i.keyword_id = ?"
+
+    # Handle NULL stars/fit - put unrated at end when sorting by stars or fit
+    if sort_col in ('i.stars', 'i.fit_score'):
+        query += f" ORDER BY {sort_col} IS NULL, {sort_col} {order_dir}"
+    else:
+        query += f" ORDER BY {sort_col} {order_dir}"
+    return query
+
+
 def get_saved_items(source: str = None, sort_by: str = 'scraped_at', order: str = 'desc',
                     filter_cart: bool = False, filter_stars: List[int] = None,
-                    filter_deck: int = None, filter_keyword: int = None) -> List[dict]:
+                    filter_deck: int = None, filter_keyword: int = None,
+                    stream: bool = False):
     """Get all saved items with optional additive filtering and sorting.
 
     Filters are additive (AND logic):
@@ -401,59 +895,45 @@ def get_saved_items(source: str = None, sort_by: str = 'scraped_at', order: str
     - filter_stars: list of 1-5 to show items with those star ratings (OR logic within stars)
     - filter_deck: deck_id to show items from that deck
     - filter_keyword: keyword_id to show items from that keyword
+    - stream: return a generator that yields rows as they arrive instead of
+      a fully-materialized list (the connection stays open until exhaustion)
     """
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
-    query = """
-        SELECT i.*, k.keyword as keyword_name, k.deck_id, d.name as deck_name
-        FROM items i
-        LEFT JOIN keywords k ON i.keyword_id = k.id
-        LEFT JOIN decks d ON k.deck_id = d.id
-        WHERE i.saved = TRUE
-    """
     params = []
-
     if source and source in ('mercari', 'yahoo', 'rakuten'):
-        query += " AND i.source = ?"
         params.append(source)
-
-    # Apply additive filters (all conditions are ANDed together)
-    if filter_cart:
-        query += " AND i.in_cart = TRUE"
-    if filter_stars is not None and len(filter_stars) > 0:
-        placeholders = ','.join('?' * len(filter_stars))
-        query += f" AND i.stars IN ({placeholders})"
-        params.extend([int(s) for s in filter_stars])
+    has_source = bool(params)
+    has_stars = filter_stars is not None and len(filter_stars) > 0
+    if has_stars:
+        params.append(json.dumps([int(s) for s in filter_stars]))
     if filter_deck is not None:
-        query += " AND k.deck_id = ?"
         params.append(int(filter_deck))
     if filter_keyword is not None:
-        query += " AND i.keyword_id = ?"
         params.append(int(filter_keyword))
 
     valid_sorts = {'price': 'i.price', 'date': 'i.scraped_at', 'stars': 'i.stars', 'scraped_at': 'i.scraped_at', 'fit': 'i.fit_score'}
     sort_col = valid_sorts.get(sort_by, 'i.scraped_at')
     order_dir = 'ASC' if order.lower() == 'asc' else 'DESC'
 
-    # Handle NULL stars/fit - put unrated at end when sorting by stars or fit
-    if sort_col in ('i.stars', 'i.fit_score'):
-        query += f" ORDER BY {sort_col} IS NULL, {sort_col} {order_dir}"
-    else:
-        query += f" ORDER BY {sort_col} {order_dir}"
-
+    query = _build_saved_sql(has_source, bool(filter_cart), has_stars,
+                             filter_deck is not None, filter_keyword is not None,
+                             sort_col, order_dir)
     cursor.execute(query, params)
-    items = [dict(row) for row in cursor.fetchall()]
+    if stream:
+        return _stream_dicts(conn, cursor)
+    items = list(_iter_dicts(cursor))
     conn.close()
     return items
 
 
 def get_item(item_id: int) -> Optional[dict]:
     """Get a single item by ID."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
-    cursor.execute("SELECT * FROM items WHERE id = ?", (item_id,))
+    cursor.execute(_SQL_GET_ITEM, (item_id,))
     row = cursor.fetchone()
     conn.close()
     return dict(row) if row else None
@@ -461,7 +941,7 @@ def get_item(item_id: int) -> Optional[dict]:
 
 def get_existing_source_ids(source: str, keyword_id: int = None) -> set:
     """Get set of source_ids already in database for a source."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     if keyword_id:
@@ -477,11 +957,44 @@ def get_existing_source_ids(source: str, keyword_id: int = None) -> set:
     return ids
 
 
+def get_existing_id_filter(source: str, keyword_id: int = None, limit: int = 5000):
+    """Bloom filter over recent source_ids for a source.
+
+    The scrapers only test membership to count consecutive overlaps, so
+    the filter's rare false positive just skips one item - in exchange
+    the ids stream out of SQLite into ~10 bits each instead of being
+    materialized as a Python set. Bounded to the most recent `limit` ids
+    because newest-first listings hit the overlap threshold long before
+    old history matters.
+    """
+    from bloom import BloomFilter
+
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    if keyword_id:
+        where, params = "source = ? AND keyword_id = ?", (source, keyword_id)
+    else:
+        where, params = "source = ?", (source,)
+
+    cursor.execute(f"SELECT COUNT(*) FROM items WHERE {where}", params)
+    capacity = min(cursor.fetchone()[0], limit)
+
+    bf = BloomFilter(capacity, error_rate=0.001)
+    cursor.execute(
+        f"SELECT source_id FROM items WHERE {where} ORDER BY id DESC LIMIT ?",
+        params + (limit,))
+    for row in cursor:
+        bf.add(row[0])
+    conn.close()
+    return bf
+
+
 # Deck management
 
 def create_deck(name: str) -> int:
     """Create a new deck. Returns deck ID."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     try:
@@ -498,7 +1011,7 @@ def create_deck(name: str) -> int:
 
 def get_decks() -> List[dict]:
     """Get all decks with keyword and item counts."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -512,14 +1025,14 @@ def get_decks() -> List[dict]:
         ORDER BY d.priority DESC, d.created_at DESC
     """)
 
-    decks = [dict(row) for row in cursor.fetchall()]
+    decks = list(_iter_dicts(cursor))
     conn.close()
     return decks
 
 
 def get_decks_with_keywords() -> List[dict]:
     """Get all decks with their keywords for hierarchical filter menu."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     # Get decks
@@ -528,7 +1041,7 @@ def get_decks_with_keywords() -> List[dict]:
         FROM decks d
         ORDER BY d.priority DESC, d.created_at DESC
     """)
-    decks = [dict(row) for row in cursor.fetchall()]
+    decks = list(_iter_dicts(cursor))
 
     # Get keywords for each deck
     for deck in decks:
@@ -541,7 +1054,7 @@ def get_decks_with_keywords() -> List[dict]:
             GROUP BY k.id
             ORDER BY k.priority DESC, k.created_at DESC
         """, (deck['id'],))
-        deck['keywords'] = [dict(row) for row in cursor.fetchall()]
+        deck['keywords'] = list(_iter_dicts(cursor))
 
     conn.close()
     return decks
@@ -549,7 +1062,7 @@ def get_decks_with_keywords() -> List[dict]:
 
 def get_deck(deck_id: int) -> Optional[dict]:
     """Get a single deck by ID with full sizing profile."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT * FROM decks WHERE id = ?", (deck_id,))
@@ -560,7 +1073,7 @@ def get_deck(deck_id: int) -> Optional[dict]:
 
 def update_deck(deck_id: int, name: str = None):
     """Update deck name."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     if name:
@@ -568,11 +1081,12 @@ def update_deck(deck_id: int, name: str = None):
 
     conn.commit()
     conn.close()
+    _invalidate_keyword_cache()
 
 
 def update_deck_sizing(deck_id: int, sizing: dict):
     """Update deck sizing profile. sizing is a dict with keys a-h, each having op and val."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     # Build dynamic update
@@ -599,7 +1113,7 @@ def delete_deck(deck_id: int):
     Also cleans up related blocklist/whitelist entries for those keywords.
     Items remain in the database but become orphaned (keyword_id points nowhere).
     """
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     # Get keyword IDs in this deck first
@@ -619,11 +1133,12 @@ def delete_deck(deck_id: int):
 
     conn.commit()
     conn.close()
+    _invalidate_keyword_cache()
 
 
 def reorder_decks(deck_ids: List[int]):
     """Reorder decks by setting their priorities based on position in list."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     for index, deck_id in enumerate(deck_ids):
@@ -636,7 +1151,7 @@ def reorder_decks(deck_ids: List[int]):
 
 def get_keywords_by_deck(deck_id: int) -> List[dict]:
     """Get all keywords for a specific deck, including blocklist info."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -648,7 +1163,7 @@ def get_keywords_by_deck(deck_id: int) -> List[dict]:
         ORDER BY k.priority DESC, k.created_at DESC
     """, (deck_id,))
 
-    keywords = [dict(row) for row in cursor.fetchall()]
+    keywords = list(_iter_dicts(cursor))
 
     # For each keyword, get blocked categories with names
     for kw in keywords:
@@ -658,7 +1173,7 @@ def get_keywords_by_deck(deck_id: int) -> List[dict]:
             LEFT JOIN categories c ON b.category_id = c.id
             WHERE b.keyword_id = ?
         """, (kw['id'],))
-        blocked = [dict(row) for row in cursor.fetchall()]
+        blocked = list(_iter_dicts(cursor))
         kw['blocked_categories'] = blocked
         kw['blocked_count'] = len(blocked)
 
@@ -668,7 +1183,7 @@ def get_keywords_by_deck(deck_id: int) -> List[dict]:
 
 def get_keyword_blocklist(keyword_id: int) -> List[dict]:
     """Get blocklist entries for a specific keyword with category names."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -680,14 +1195,14 @@ def get_keyword_blocklist(keyword_id: int) -> List[dict]:
         ORDER BY b.created_at DESC
     """, (keyword_id,))
 
-    entries = [dict(row) for row in cursor.fetchall()]
+    entries = list(_iter_dicts(cursor))
     conn.close()
     return entries
 
 
 def remove_from_keyword_blocklist(keyword_id: int, category_id: str) -> bool:
     """Remove a category from a keyword's blocklist. Returns True if removed."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -698,23 +1213,26 @@ def remove_from_keyword_blocklist(keyword_id: int, category_id: str) -> bool:
     removed = cursor.rowcount > 0
     conn.commit()
     conn.close()
+    if removed:
+        _is_blocked_cached.cache_clear()
     return removed
 
 
 def move_keyword_to_deck(keyword_id: int, deck_id: int):
     """Move a keyword to a different deck."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     cursor.execute("UPDATE keywords SET deck_id = ? WHERE id = ?", (deck_id, keyword_id))
 
     conn.commit()
     conn.close()
+    _invalidate_keyword_cache()
 
 
 def get_deck_for_keyword(keyword_id: int) -> Optional[dict]:
     """Get the deck that contains a keyword. Used for breadcrumb display."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -730,10 +1248,10 @@ def get_deck_for_keyword(keyword_id: int) -> Optional[dict]:
 
 def update_item_fit_score(item_id: int, score: int):
     """Update an item's fit score (1-4)."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
-    cursor.execute("UPDATE items SET fit_score = ? WHERE id = ?", (score, item_id))
+    cursor.execute(_SQL_UPDATE_FIT_SCORE, (score, item_id))
 
     conn.commit()
     conn.close()
@@ -750,7 +1268,7 @@ def add_keyword(keyword: str, source: str = 'both', deck_id: int = None) -> int:
     if deck_id is None:
         deck_id = 1
 
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     try:
@@ -770,7 +1288,7 @@ def add_keyword(keyword: str, source: str = 'both', deck_id: int = None) -> int:
 
 def get_keywords() -> List[dict]:
     """Get all keywords with stats, ordered by priority."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -782,32 +1300,36 @@ def get_keywords() -> List[dict]:
         ORDER BY k.priority DESC, k.created_at DESC
     """)
 
-    keywords = [dict(row) for row in cursor.fetchall()]
+    keywords = list(_iter_dicts(cursor))
     conn.close()
     return keywords
 
 
 def get_keywords_with_unseen_counts() -> List[dict]:
     """Get all keywords with their unseen item counts (excluding hidden items)."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
+    # Scalar subquery per keyword instead of a grouped LEFT JOIN over all
+    # items: each count is an index-only scan of the unseen partition
+    # (idx_items_unseen_by_kw), skipping the seen majority entirely
     cursor.execute("""
         SELECT k.id, k.keyword, k.priority, k.deck_id, d.name as deck_name,
-               COUNT(CASE WHEN i.seen = FALSE AND i.saved = FALSE AND (i.hidden = FALSE OR i.hidden IS NULL) THEN 1 END) as unseen_count
+               (SELECT COUNT(*) FROM items i
+                WHERE i.keyword_id = k.id
+                  AND i.seen = 0 AND i.saved = 0
+                  AND (i.hidden = 0 OR i.hidden IS NULL)) as unseen_count
         FROM keywords k
         LEFT JOIN decks d ON k.deck_id = d.id
-        LEFT JOIN items i ON i.keyword_id = k.id
-        GROUP BY k.id
         ORDER BY k.priority DESC, k.created_at DESC
     """)
-    keywords = [dict(row) for row in cursor.fetchall()]
+    keywords = list(_iter_dicts(cursor))
     conn.close()
     return keywords
 
 
 def prioritize_keyword(keyword_id: int):
     """Set keyword to highest priority (top of deck)."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     # Get current max priority
@@ -817,13 +1339,14 @@ def prioritize_keyword(keyword_id: int):
 
     # Set this keyword's priority to max + 1
     cursor.execute("UPDATE keywords SET priority = ? WHERE id = ?", (max_priority + 1, keyword_id))
+    cursor.execute("UPDATE items SET keyword_priority = ? WHERE keyword_id = ?", (max_priority + 1, keyword_id))
     conn.commit()
     conn.close()
 
 
 def deprioritize_keyword(keyword_id: int):
     """Set keyword to lowest priority (bottom of deck)."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     # Get current min priority
@@ -833,19 +1356,21 @@ def deprioritize_keyword(keyword_id: int):
 
     # Set this keyword's priority to min - 1
     cursor.execute("UPDATE keywords SET priority = ? WHERE id = ?", (min_priority - 1, keyword_id))
+    cursor.execute("UPDATE items SET keyword_priority = ? WHERE keyword_id = ?", (min_priority - 1, keyword_id))
     conn.commit()
     conn.close()
 
 
 def reorder_keywords(keyword_ids: List[int]):
     """Reorder keywords by setting their priorities based on position in list."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     # First ID in list gets highest priority, last gets lowest
     for index, keyword_id in enumerate(keyword_ids):
         priority = len(keyword_ids) - index
         cursor.execute("UPDATE keywords SET priority = ? WHERE id = ?", (priority, keyword_id))
+        cursor.execute("UPDATE items SET keyword_priority = ? WHERE keyword_id = ?", (priority, keyword_id))
 
     conn.commit()
     conn.close()
@@ -853,10 +1378,17 @@ def reorder_keywords(keyword_ids: List[int]):
 
 def delete_keyword(keyword_id: int):
     """Delete a keyword and its unseen/unsaved items."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
-    # Delete unseen/unsaved items associated with this keyword
+    # Delete unseen/unsaved items associated with this keyword (and their
+    # detail rows)
+    cursor.execute("""
+        DELETE FROM item_details WHERE item_id IN (
+            SELECT id FROM items
+            WHERE keyword_id = ? AND seen = FALSE AND saved = FALSE
+        )
+    """, (keyword_id,))
     cursor.execute("""
         DELETE FROM items
         WHERE keyword_id = ? AND seen = FALSE AND saved = FALSE
@@ -872,11 +1404,12 @@ def delete_keyword(keyword_id: int):
     cursor.execute("DELETE FROM keywords WHERE id = ?", (keyword_id,))
     conn.commit()
     conn.close()
+    _invalidate_keyword_cache()
 
 
 def update_keyword_scraped(keyword_id: int, item_count: int):
     """Update keyword after scraping."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -893,42 +1426,83 @@ def update_keyword_scraped(keyword_id: int, item_count: int):
 
 def save_scraped_items(items: List[dict], keyword_id: int) -> int:
     """Save scraped items. Returns count of new items added. Items in blocked categories are marked hidden."""
-    import json
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
     new_count = 0
 
-    for item in items:
-        try:
-            images = item.get('images')
-            if images and isinstance(images, list):
-                images = json.dumps(images)
+    # Fetch the keyword's priority once - stored denormalized on each item row
+    cursor.execute("SELECT priority FROM keywords WHERE id = ?", (keyword_id,))
+    row = cursor.fetchone()
+    keyword_priority = row['priority'] if row and row['priority'] is not None else 0
 
-            # Check if category is blocked
-            category_id = item.get('category_id')
-            hidden = is_category_blocked(category_id, keyword_id) if category_id else False
+    # Prefetch the blocklist (global + this keyword) and the category parent
+    # map once, so the per-item blocked check is a pure in-memory ancestor
+    # walk instead of a SELECT per item
+    cursor.execute("""
+        SELECT category_id FROM category_blocklist
+        WHERE keyword_id = ? OR keyword_id IS NULL
+    """, (keyword_id,))
+    blocked = frozenset(row['category_id'] for row in cursor.fetchall())
+    parents = {}
+    if blocked:
+        cursor.execute("SELECT id, parent_id FROM categories")
+        parents = {row['id']: row['parent_id'] for row in cursor.fetchall()}
+
+    def _blocked_in_memory(cat_id):
+        current = cat_id
+        for _ in range(10):  # max depth, mirrors is_category_blocked
+            if current in blocked:
+                return True
+            current = parents.get(current)
+            if not current:
+                return False
+        return False
 
-            cursor.execute("""
-                INSERT INTO items (source, source_id, title, price, image_url, images, description, url, keyword_id, is_auction, auction_end_time, category_id, hidden)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-            """, (
-                item.get('source'),
-                item.get('source_id'),
-                item.get('title'),
-                item.get('price'),
-                item.get('image_url'),
-                images,
-                item.get('description'),
-                item.get('url'),
-                keyword_id,
-                item.get('is_auction', False),
-                item.get('auction_end_time'),
-                category_id,
-                hidden,
-            ))
-            new_count += 1
-        except sqlite3.IntegrityError:
-            pass  # Skip duplicates
+    # Build all rows up front and insert in one executemany inside a single
+    # transaction: one prepared statement reused per row, one commit/fsync
+    # for the whole batch. OR IGNORE keeps the duplicate-skip semantics.
+    rows = []
+    detail_items = []
+    for item in items:
+        images = item.get('images')
+        if images and isinstance(images, list):
+            images = json.dumps(images, separators=(',', ':'))
+
+        # Check if category is blocked
+        category_id = item.get('category_id')
+        hidden = _blocked_in_memory(category_id) if category_id else False
+
+        rows.append((
+            item.get('source'),
+            item.get('source_id'),
+            item.get('title'),
+            item.get('price'),
+            item.get('image_url'),
+            item.get('url'),
+            keyword_id,
+            keyword_priority,
+            item.get('is_auction', False),
+            item.get('auction_end_time'),
+            category_id,
+            hidden,
+        ))
+        if item.get('description') or images:
+            detail_items.append((item.get('source'), item.get('source_id'),
+                                 item.get('description'), images))
+
+    cursor.executemany("""
+        INSERT OR IGNORE INTO items (source, source_id, title, price, image_url, url, keyword_id, keyword_priority, is_auction, auction_end_time, category_id, hidden)
+        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+    """, rows)
+    new_count = cursor.rowcount
+
+    # json(?) lets SQLite's JSON1 parser validate/canonicalize the images
+    # blob in C; json(NULL) passes NULL through
+    for source, source_id, description, images in detail_items:
+        cursor.execute("""
+            INSERT OR REPLACE INTO item_details (item_id, description, images)
+            SELECT id, ?, json(?) FROM items WHERE source = ? AND source_id = ?
+        """, (description, images, source, source_id))
 
     conn.commit()
     conn.close()
@@ -937,7 +1511,7 @@ def save_scraped_items(items: List[dict], keyword_id: int) -> int:
 
 def update_item_sold_status(item_id: int, sold_status: str, price: int = None):
     """Update an item's sold status and optionally its price."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     if price is not None:
@@ -964,72 +1538,67 @@ def import_item(source: str, source_id: str, url: str, title: str = None, price:
     Updates existing items with fresh data, or creates new ones.
     Returns item_id.
     """
-    import json as json_lib
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
-    # Convert images list to JSON if needed
+    # Convert images list to JSON if needed (compact separators: no
+    # whitespace bytes stored per row)
     if images and isinstance(images, list):
-        images = json_lib.dumps(images)
+        images = json.dumps(images, separators=(',', ':'))
 
-    # Check if item already exists
-    cursor.execute(
-        "SELECT id FROM items WHERE source = ? AND source_id = ?",
-        (source, source_id)
-    )
-    existing = cursor.fetchone()
-    if existing:
-        # Already exists - update with fresh data and mark as saved
-        cursor.execute("""
-            UPDATE items SET
-                saved = TRUE,
-                seen = TRUE,
-                title = COALESCE(?, title),
-                price = COALESCE(?, price),
-                image_url = COALESCE(?, image_url),
-                images = COALESCE(?, images),
-                description = COALESCE(?, description),
-                is_auction = ?,
-                auction_end_time = COALESCE(?, auction_end_time),
-                sold_status = ?
-            WHERE id = ?
-        """, (
-            title,
-            price,
-            image_url,
-            images,
-            description,
-            1 if is_auction else 0,
-            auction_end_time,
-            sold_status,
-            existing['id']
-        ))
-        conn.commit()
-        conn.close()
-        return existing['id']
-
-    # Insert new item as saved
-    cursor.execute("""
-        INSERT INTO items (source, source_id, title, price, image_url, images, description, url,
+    # Single UPSERT: insert as saved, or refresh an existing row in place.
+    # COALESCE keeps old values when the caller passed nothing new.
+    upsert_sql = """
+        INSERT INTO items (source, source_id, title, price, image_url, url,
                           keyword_id, is_auction, auction_end_time, sold_status, saved, seen)
-        VALUES (?, ?, ?, ?, ?, ?, ?, ?, NULL, ?, ?, ?, TRUE, TRUE)
-    """, (
+        VALUES (?, ?, ?, ?, ?, ?, NULL, ?, ?, ?, TRUE, TRUE)
+        ON CONFLICT(source, source_id) DO UPDATE SET
+            saved = TRUE,
+            seen = TRUE,
+            title = COALESCE(excluded.title, title),
+            price = COALESCE(excluded.price, price),
+            image_url = COALESCE(excluded.image_url, image_url),
+            is_auction = excluded.is_auction,
+            auction_end_time = COALESCE(excluded.auction_end_time, auction_end_time),
+            sold_status = excluded.sold_status
+    """
+    params = (
         source,
         source_id,
         title,
         price,
         image_url,
-        images,
-        description,
         url,
         1 if is_auction else 0,
         auction_end_time,
         sold_status,
-    ))
+    )
+    # try/finally so a malformed images blob (json() raises in SQLite)
+    # can't skip releasing the pooled writer
+    try:
+        if _HAS_RETURNING:
+            cursor.execute(upsert_sql + " RETURNING id", params)
+            item_id = cursor.fetchone()['id']
+        else:
+            cursor.execute(upsert_sql, params)
+            cursor.execute("SELECT id FROM items WHERE source = ? AND source_id = ?", (source, source_id))
+            item_id = cursor.fetchone()['id']
 
-    item_id = cursor.lastrowid
-    conn.commit()
-    conn.close()
+        if description or images:
+            cursor.execute("""
+                INSERT INTO item_details (item_id, description, images)
+                VALUES (?, ?, json(?))
+                ON CONFLICT(item_id) DO UPDATE SET
+                    description = COALESCE(excluded.description, description),
+                    images = COALESCE(excluded.images, images)
+            """, (item_id, description, images))
+            # The details row changed under detail_scraper's display
+            # cache; drop the stale entry (lazy import avoids a cycle)
+            from detail_scraper import invalidate_display_cache
+            invalidate_display_cache(item_id)
+        conn.commit()
+    finally:
+        conn.close()
     return item_id
 
 
@@ -1037,26 +1606,23 @@ def import_item(source: str, source_id: str, url: str, title: str = None, price:
 
 def get_stats() -> dict:
     """Get database statistics."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
-    stats = {}
-
-    cursor.execute("SELECT COUNT(*) as count FROM items")
-    stats['total_items'] = cursor.fetchone()['count']
-
-    # Unseen items excludes hidden items (blocked categories) and unsaved items
+    # One pass over items instead of four separate COUNT queries.
+    # Unseen excludes hidden items (blocked categories) and saved items.
     cursor.execute("""
-        SELECT COUNT(*) as count FROM items
-        WHERE seen = FALSE AND saved = FALSE AND (hidden = FALSE OR hidden IS NULL)
+        SELECT
+            COUNT(*) as total_items,
+            SUM(CASE WHEN seen = FALSE AND saved = FALSE AND (hidden = FALSE OR hidden IS NULL) THEN 1 ELSE 0 END) as unseen_items,
+            SUM(CASE WHEN saved = TRUE THEN 1 ELSE 0 END) as saved_items,
+            SUM(CASE WHEN stars IS NOT NULL THEN 1 ELSE 0 END) as rated_items
+        FROM items
     """)
-    stats['unseen_items'] = cursor.fetchone()['count']
-
-    cursor.execute("SELECT COUNT(*) as count FROM items WHERE saved = TRUE")
-    stats['saved_items'] = cursor.fetchone()['count']
-
-    cursor.execute("SELECT COUNT(*) as count FROM items WHERE stars IS NOT NULL")
-    stats['rated_items'] = cursor.fetchone()['count']
+    stats = dict(cursor.fetchone())
+    # SUM over zero rows is NULL
+    for key in ('unseen_items', 'saved_items', 'rated_items'):
+        stats[key] = stats[key] or 0
 
     cursor.execute("SELECT COUNT(*) as count FROM keywords")
     stats['total_keywords'] = cursor.fetchone()['count']
@@ -1069,7 +1635,7 @@ def get_stats() -> dict:
 
 def add_category(cat_id: str, source: str, name: str, parent_id: str = None, path: str = None, name_en: str = None):
     """Add or update a category in the cache."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -1077,13 +1643,28 @@ def add_category(cat_id: str, source: str, name: str, parent_id: str = None, pat
         VALUES (?, ?, ?, ?, ?, ?)
     """, (cat_id, source, name, name_en, parent_id, path))
 
+    # Keep the closure table in sync: self pair plus the parent's whole
+    # ancestor chain shifted down one level
+    cursor.execute("""
+        INSERT OR IGNORE INTO category_closure (ancestor, descendant, depth)
+        VALUES (?, ?, 0)
+    """, (cat_id, cat_id))
+    if parent_id:
+        cursor.execute("""
+            INSERT OR IGNORE INTO category_closure (ancestor, descendant, depth)
+            SELECT ancestor, ?, depth + 1 FROM category_closure WHERE descendant = ?
+        """, (cat_id, parent_id))
+
     conn.commit()
     conn.close()
+    if parent_id:
+        # New parent edge can change the ancestor chain of blocked checks
+        _is_blocked_cached.cache_clear()
 
 
 def get_category(cat_id: str) -> Optional[dict]:
     """Get a category by ID."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT * FROM categories WHERE id = ?", (cat_id,))
@@ -1096,20 +1677,44 @@ def get_category_ancestors(cat_id: str) -> List[str]:
     """Get list of category IDs from this category up to root. No API fetching."""
     if not cat_id:
         return []
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
-    ancestors = [cat_id]
-    current = cat_id
-    for _ in range(10):  # max depth
-        cursor.execute("SELECT parent_id FROM categories WHERE id = ?", (current,))
-        row = cursor.fetchone()
-        if row and row['parent_id']:
-            ancestors.append(row['parent_id'])
-            current = row['parent_id']
-        else:
-            break
+    # Closure-table lookup: one indexed range scan, ordered leaf to root
+    cursor.execute("""
+        SELECT ancestor FROM category_closure
+        WHERE descendant = ?
+        ORDER BY depth
+    """, (cat_id,))
+    ancestors = [row['ancestor'] for row in cursor.fetchall()]
     conn.close()
-    return ancestors
+    # Category not cached yet - fall back to just itself, as before
+    return ancestors or [cat_id]
+
+
+def _cache_category_chain(cursor, source: str, chain: List[dict]):
+    """Cache a root-to-leaf category chain in two executemany batches.
+
+    chain is an ordered list of {id, name} dicts from root to leaf. Also
+    records the chain's closure rows, which the per-node INSERTs used to
+    leave for the init_db backfill.
+    """
+    cat_rows = []
+    closure_rows = []
+    prev_id = None
+    for depth, cat in enumerate(chain):
+        cat_rows.append((cat['id'], source, cat['name'], prev_id))
+        prev_id = cat['id']
+        for offset in range(depth + 1):
+            closure_rows.append((chain[offset]['id'], cat['id'], depth - offset))
+    cursor.executemany("""
+        INSERT OR REPLACE INTO categories (id, source, name, parent_id)
+        VALUES (?, ?, ?, ?)
+    """, cat_rows)
+    cursor.executemany("""
+        INSERT OR IGNORE INTO category_closure (ancestor, descendant, depth)
+        VALUES (?, ?, ?)
+    """, closure_rows)
+    _is_blocked_cached.cache_clear()
 
 
 def fetch_mercari_category_hierarchy(cat_id: str) -> List[dict]:
@@ -1124,7 +1729,7 @@ def fetch_mercari_category_hierarchy(cat_id: str) -> List[dict]:
     # Instead, let's fetch any item and use parent_categories_ntiers structure
     # Actually, we can get category info by fetching item details
     # But we need an item ID... Let's query our DB for one
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT source_id FROM items WHERE category_id = ? LIMIT 1", (cat_id,))
     row = cursor.fetchone()
@@ -1148,32 +1753,16 @@ def fetch_mercari_category_hierarchy(cat_id: str) -> List[dict]:
         parents = data.get("parent_categories_ntiers", [])
         leaf = data.get("item_category_ntiers", {})
 
-        # Build hierarchy and cache it
-        ancestors = []
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        # Parents go from root to immediate parent
-        prev_id = None
-        for p in parents:
-            full_id = f"mercari:{p['id']}"
-            ancestors.append({"id": full_id, "name": p["name"]})
-            # Cache in DB
-            cursor.execute("""
-                INSERT OR REPLACE INTO categories (id, source, name, parent_id)
-                VALUES (?, 'mercari', ?, ?)
-            """, (full_id, p["name"], prev_id))
-            prev_id = full_id
-
-        # Add the leaf category
+        # Build hierarchy: parents go from root to immediate parent,
+        # then the leaf category
+        ancestors = [{"id": f"mercari:{p['id']}", "name": p["name"]} for p in parents]
         if leaf:
-            full_id = f"mercari:{leaf['id']}"
-            ancestors.append({"id": full_id, "name": leaf["name"]})
-            cursor.execute("""
-                INSERT OR REPLACE INTO categories (id, source, name, parent_id)
-                VALUES (?, 'mercari', ?, ?)
-            """, (full_id, leaf["name"], prev_id))
+            ancestors.append({"id": f"mercari:{leaf['id']}", "name": leaf["name"]})
 
+        # Cache the whole chain in one batched transaction
+        conn = get_write_connection()
+        cursor = conn.cursor()
+        _cache_category_chain(cursor, 'mercari', ancestors)
         conn.commit()
         conn.close()
         return ancestors
@@ -1187,14 +1776,13 @@ def fetch_yahoo_category_hierarchy(cat_id: str) -> List[dict]:
     """Fetch category hierarchy from Yahoo and cache it. Returns list from root to leaf."""
     import httpx
     import re
-    import json
 
     numeric_id = cat_id.replace("yahoo:", "")
 
     # Yahoo category API - try fetching category page
     try:
         # Get an item with this category to extract hierarchy from its page
-        conn = get_connection()
+        conn = get_read_connection()
         cursor = conn.cursor()
         cursor.execute("SELECT url FROM items WHERE category_id = ? LIMIT 1", (cat_id,))
         row = cursor.fetchone()
@@ -1231,24 +1819,17 @@ def fetch_yahoo_category_hierarchy(cat_id: str) -> List[dict]:
         if not category_path:
             return [{"id": cat_id, "name": cat_id}]
 
-        # Build hierarchy and cache (skip first "オークション" root)
-        ancestors = []
-        conn = get_connection()
-        cursor = conn.cursor()
-
-        prev_id = None
-        for cat in category_path:
-            if cat.get("id") == "0":  # Skip root "オークション"
-                continue
-            cat_id_full = f"yahoo:{cat.get('id')}"
-            cat_name = cat.get("name", cat_id_full)
-            ancestors.append({"id": cat_id_full, "name": cat_name})
-            cursor.execute("""
-                INSERT OR REPLACE INTO categories (id, source, name, parent_id)
-                VALUES (?, 'yahoo', ?, ?)
-            """, (cat_id_full, cat_name, prev_id))
-            prev_id = cat_id_full
+        # Build hierarchy (skip first "オークション" root)
+        ancestors = [
+            {"id": f"yahoo:{cat.get('id')}", "name": cat.get("name", f"yahoo:{cat.get('id')}")}
+            for cat in category_path
+            if cat.get("id") != "0"
+        ]
 
+        # Cache the whole chain in one batched transaction
+        conn = get_write_connection()
+        cursor = conn.cursor()
+        _cache_category_chain(cursor, 'yahoo', ancestors)
         conn.commit()
         conn.close()
         return ancestors
@@ -1264,7 +1845,7 @@ def get_category_ancestors_with_names(cat_id: str) -> List[dict]:
     if not cat_id:
         return []
 
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     # First, try to build from cached data
@@ -1300,40 +1881,28 @@ def hide_items_by_category(category_id: str, keyword_id: int = None) -> int:
     If keyword_id is provided, only hide items from that keyword.
     Returns count of items hidden.
     """
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
-    # Get all descendant categories (categories where this is an ancestor)
-    # We need to find categories where parent chain includes category_id
-    # For now, we'll just match the exact category and its direct children
-    # Since we store parent_id, we need to find all categories with this parent
-    categories_to_hide = [category_id]
-
-    # Find all descendant categories recursively
-    def get_descendants(parent_id):
-        cursor.execute("SELECT id FROM categories WHERE parent_id = ?", (parent_id,))
-        children = [row['id'] for row in cursor.fetchall()]
-        for child in children:
-            categories_to_hide.append(child)
-            get_descendants(child)
-
-    get_descendants(category_id)
-
-    # Build query
-    placeholders = ','.join('?' * len(categories_to_hide))
+    # Subtree lookup via the closure table - one indexed UPDATE. The
+    # direct category_id check covers categories not cached in the tree.
+    subtree = """
+        category_id = ?
+        OR category_id IN (SELECT descendant FROM category_closure WHERE ancestor = ?)
+    """
     if keyword_id:
         cursor.execute(f"""
             UPDATE items SET hidden = TRUE
-            WHERE category_id IN ({placeholders})
+            WHERE ({subtree})
             AND keyword_id = ?
             AND seen = FALSE AND saved = FALSE
-        """, categories_to_hide + [keyword_id])
+        """, (category_id, category_id, keyword_id))
     else:
         cursor.execute(f"""
             UPDATE items SET hidden = TRUE
-            WHERE category_id IN ({placeholders})
+            WHERE ({subtree})
             AND seen = FALSE AND saved = FALSE
-        """, categories_to_hide)
+        """, (category_id, category_id))
 
     count = cursor.rowcount
     conn.commit()
@@ -1341,6 +1910,28 @@ def hide_items_by_category(category_id: str, keyword_id: int = None) -> int:
     return count
 
 
+@functools.lru_cache(maxsize=4096)
+def _is_blocked_cached(category_id: str, keyword_id: Optional[int]) -> bool:
+    """Cached blocked check. Cleared whenever the blocklist or category tree changes."""
+    conn = get_read_connection()
+    cursor = conn.cursor()
+
+    # Single equijoin against the closure table. The direct category_id
+    # check covers categories not cached in the tree yet. Matches the old
+    # semantics: global entries always apply, keyword entries only when
+    # keyword_id is given (= NULL never matches a NULL parameter).
+    cursor.execute("""
+        SELECT 1 FROM category_blocklist
+        WHERE (category_id = ?
+               OR category_id IN (SELECT ancestor FROM category_closure WHERE descendant = ?))
+        AND (keyword_id IS NULL OR keyword_id = ?)
+        LIMIT 1
+    """, (category_id, category_id, keyword_id))
+    blocked = cursor.fetchone() is not None
+    conn.close()
+    return blocked
+
+
 def is_category_blocked(category_id: str, keyword_id: int = None) -> bool:
     """
     Check if a category (or any of its ancestors) is in the blocklist.
@@ -1348,64 +1939,21 @@ def is_category_blocked(category_id: str, keyword_id: int = None) -> bool:
     """
     if not category_id:
         return False
-
-    conn = get_connection()
-    cursor = conn.cursor()
-
-    # Get all ancestors for this category
-    ancestors = [category_id]
-    current = category_id
-    for _ in range(10):  # max depth
-        cursor.execute("SELECT parent_id FROM categories WHERE id = ?", (current,))
-        row = cursor.fetchone()
-        if row and row['parent_id']:
-            ancestors.append(row['parent_id'])
-            current = row['parent_id']
-        else:
-            break
-
-    # Check blocklist for any ancestor
-    placeholders = ','.join('?' * len(ancestors))
-
-    # Check global blocklist
-    cursor.execute(f"""
-        SELECT 1 FROM category_blocklist
-        WHERE category_id IN ({placeholders}) AND keyword_id IS NULL
-        LIMIT 1
-    """, ancestors)
-    if cursor.fetchone():
-        conn.close()
-        return True
-
-    # Check keyword-specific blocklist
-    if keyword_id:
-        cursor.execute(f"""
-            SELECT 1 FROM category_blocklist
-            WHERE category_id IN ({placeholders}) AND keyword_id = ?
-            LIMIT 1
-        """, ancestors + [keyword_id])
-        if cursor.fetchone():
-            conn.close()
-            return True
-
-    conn.close()
-    return False
+    return _is_blocked_cached(category_id, keyword_id)
 
 
 def add_keyword_whitelist(keyword_id: int, category_ids: List[str]):
     """Set the whitelist for a keyword (replaces existing)."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
-    # Clear existing whitelist
+    # Clear existing whitelist, then batch the new entries in one
+    # executemany - same transaction, one statement prepare
     cursor.execute("DELETE FROM keyword_whitelist WHERE keyword_id = ?", (keyword_id,))
-
-    # Add new entries
-    for cat_id in category_ids:
-        cursor.execute("""
-            INSERT INTO keyword_whitelist (keyword_id, category_id)
-            VALUES (?, ?)
-        """, (keyword_id, cat_id))
+    cursor.executemany("""
+        INSERT INTO keyword_whitelist (keyword_id, category_id)
+        VALUES (?, ?)
+    """, [(keyword_id, cat_id) for cat_id in category_ids])
 
     conn.commit()
     conn.close()
@@ -1413,7 +1961,7 @@ def add_keyword_whitelist(keyword_id: int, category_ids: List[str]):
 
 def get_keyword_whitelist(keyword_id: int) -> set:
     """Get the whitelist for a keyword as a set of category IDs."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute("SELECT category_id FROM keyword_whitelist WHERE keyword_id = ?", (keyword_id,))
@@ -1425,7 +1973,7 @@ def get_keyword_whitelist(keyword_id: int) -> set:
 
 def add_to_blocklist(category_id: str, keyword_id: int = None) -> int:
     """Add a category to the blocklist. Returns blocklist entry ID."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     try:
@@ -1444,18 +1992,20 @@ def add_to_blocklist(category_id: str, keyword_id: int = None) -> int:
         entry_id = cursor.fetchone()['id']
 
     conn.close()
+    _is_blocked_cached.cache_clear()
     return entry_id
 
 
 def remove_from_blocklist(entry_id: int):
     """Remove an entry from the blocklist."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     cursor.execute("DELETE FROM category_blocklist WHERE id = ?", (entry_id,))
 
     conn.commit()
     conn.close()
+    _is_blocked_cached.cache_clear()
 
 
 def get_blocklist(keyword_id: int = None) -> tuple:
@@ -1463,7 +2013,7 @@ def get_blocklist(keyword_id: int = None) -> tuple:
     Get blocklist entries.
     Returns (global_blocklist, keyword_blocklist) as sets of category IDs.
     """
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     # Global blocklist (keyword_id IS NULL)
@@ -1482,7 +2032,7 @@ def get_blocklist(keyword_id: int = None) -> tuple:
 
 def get_all_blocklist_entries() -> List[dict]:
     """Get all blocklist entries with category info."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -1493,14 +2043,14 @@ def get_all_blocklist_entries() -> List[dict]:
         ORDER BY b.created_at DESC
     """)
 
-    entries = [dict(row) for row in cursor.fetchall()]
+    entries = list(_iter_dicts(cursor))
     conn.close()
     return entries
 
 
 def update_item_category(item_id: int, category_id: str):
     """Update an item's category_id."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     cursor.execute("UPDATE items SET category_id = ? WHERE id = ?", (category_id, item_id))
@@ -1515,16 +2065,16 @@ def update_item_category(item_id: int, category_id: str):
 
 def create_magic_link(email: str, link_type: str = 'login') -> str:
     """Create a magic link token for email. Returns the token."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     token = secrets.token_urlsafe(32)
-    expires_at = datetime.utcnow() + timedelta(hours=MAGIC_LINK_VALIDITY_HOURS)
+    expires_at = int(time.time()) + MAGIC_LINK_VALIDITY_HOURS * 3600
 
     cursor.execute("""
         INSERT INTO magic_links (email, token, expires_at, link_type)
         VALUES (?, ?, ?, ?)
-    """, (email.lower(), token, expires_at.isoformat(), link_type))
+    """, (email.lower(), token, expires_at, link_type))
 
     conn.commit()
     conn.close()
@@ -1533,43 +2083,41 @@ def create_magic_link(email: str, link_type: str = 'login') -> str:
 
 def verify_magic_link(token: str) -> Optional[dict]:
     """Verify a magic link token. Returns {email, link_type} if valid, None otherwise."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
-    cursor.execute("""
-        SELECT email, link_type, expires_at, used_at
-        FROM magic_links WHERE token = ?
-    """, (token,))
-
-    row = cursor.fetchone()
-    if not row:
-        conn.close()
-        return None
-
-    # Check if already used
-    if row['used_at']:
-        conn.close()
-        return None
-
-    # Check if expired
-    expires_at = datetime.fromisoformat(row['expires_at'])
-    if datetime.utcnow() > expires_at:
-        conn.close()
-        return None
+    # One atomic UPDATE: the used/expired checks live in the WHERE clause,
+    # so a link can only ever be consumed once even under concurrent calls
+    now = int(time.time())
+    if _HAS_RETURNING:
+        cursor.execute("""
+            UPDATE magic_links SET used_at = CURRENT_TIMESTAMP
+            WHERE token = ? AND used_at IS NULL AND expires_at > ?
+            RETURNING email, link_type
+        """, (token, now))
+        row = cursor.fetchone()
+    else:
+        cursor.execute("""
+            SELECT email, link_type FROM magic_links
+            WHERE token = ? AND used_at IS NULL AND expires_at > ?
+        """, (token, now))
+        row = cursor.fetchone()
+        if row:
+            cursor.execute("""
+                UPDATE magic_links SET used_at = CURRENT_TIMESTAMP WHERE token = ?
+            """, (token,))
 
-    # Mark as used
-    cursor.execute("""
-        UPDATE magic_links SET used_at = CURRENT_TIMESTAMP WHERE token = ?
-    """, (token,))
     conn.commit()
     conn.close()
 
+    if not row:
+        return None
     return {'email': row['email'], 'link_type': row['link_type']}
 
 
 def create_session(user_id: int) -> str:
     """Create a new session for user. Returns session token."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     token = secrets.token_urlsafe(32)
@@ -1589,7 +2137,7 @@ def get_user_from_session(token: str) -> Optional[dict]:
     if not token:
         return None
 
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -1606,7 +2154,7 @@ def get_user_from_session(token: str) -> Optional[dict]:
 
 def delete_session(token: str):
     """Delete a session (logout)."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
     cursor.execute("DELETE FROM sessions WHERE token = ?", (token,))
     conn.commit()
@@ -1615,37 +2163,30 @@ def delete_session(token: str):
 
 def get_or_create_user(email: str) -> dict:
     """Get existing user by email, or create new one. Returns user dict."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
-    cursor.execute("SELECT * FROM users WHERE email = ?", (email.lower(),))
-    row = cursor.fetchone()
-
-    if row:
-        # Update last login
-        cursor.execute("""
-            UPDATE users SET last_login_at = CURRENT_TIMESTAMP WHERE id = ?
-        """, (row['id'],))
-        conn.commit()
-        conn.close()
-        return dict(row)
-
-    # Create new user
-    cursor.execute("""
+    # One UPSERT covers both cases: create the user, or stamp last_login_at
+    # on the existing row, and hand back the row in the same statement
+    upsert_sql = """
         INSERT INTO users (email) VALUES (?)
-    """, (email.lower(),))
-    user_id = cursor.lastrowid
+        ON CONFLICT(email) DO UPDATE SET last_login_at = CURRENT_TIMESTAMP
+    """
+    if _HAS_RETURNING:
+        cursor.execute(upsert_sql + " RETURNING *", (email.lower(),))
+        row = cursor.fetchone()
+    else:
+        cursor.execute(upsert_sql, (email.lower(),))
+        cursor.execute("SELECT * FROM users WHERE email = ?", (email.lower(),))
+        row = cursor.fetchone()
     conn.commit()
-
-    cursor.execute("SELECT * FROM users WHERE id = ?", (user_id,))
-    row = cursor.fetchone()
     conn.close()
     return dict(row)
 
 
 def get_user_by_email(email: str) -> Optional[dict]:
     """Get user by email. Returns user dict or None."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM users WHERE email = ?", (email.lower(),))
     row = cursor.fetchone()
@@ -1655,7 +2196,7 @@ def get_user_by_email(email: str) -> Optional[dict]:
 
 def get_user_by_username(username: str) -> Optional[dict]:
     """Get user by username. Returns user dict or None."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM users WHERE username = ?", (username,))
     row = cursor.fetchone()
@@ -1665,19 +2206,20 @@ def get_user_by_username(username: str) -> Optional[dict]:
 
 def set_username(user_id: int, username: str) -> bool:
     """Set username for user. Returns True if successful, False if taken."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
-    # Check if username is taken
-    cursor.execute("SELECT id FROM users WHERE username = ? AND id != ?", (username, user_id))
-    if cursor.fetchone():
-        conn.close()
+    # Single UPDATE: the UNIQUE(username) constraint does the taken-check
+    # atomically instead of a racy SELECT-then-UPDATE
+    try:
+        cursor.execute("UPDATE users SET username = ? WHERE id = ?", (username, user_id))
+        conn.commit()
+        return True
+    except sqlite3.IntegrityError:
+        # Username taken by another user
         return False
-
-    cursor.execute("UPDATE users SET username = ? WHERE id = ?", (username, user_id))
-    conn.commit()
-    conn.close()
-    return True
+    finally:
+        conn.close()
 
 
 # =====================================================
@@ -1686,7 +2228,7 @@ def set_username(user_id: int, username: str) -> bool:
 
 def create_invite_request(email: str, reason: str = None) -> Optional[int]:
     """Create an invite request. Returns request ID or None if already exists."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     try:
@@ -1705,7 +2247,7 @@ def create_invite_request(email: str, reason: str = None) -> Optional[int]:
 
 def get_invite_request_by_email(email: str) -> Optional[dict]:
     """Get invite request by email."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM invite_requests WHERE email = ?", (email.lower(),))
     row = cursor.fetchone()
@@ -1715,45 +2257,53 @@ def get_invite_request_by_email(email: str) -> Optional[dict]:
 
 def get_pending_invite_requests() -> List[dict]:
     """Get all pending invite requests, ordered by date."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     cursor.execute("""
         SELECT * FROM invite_requests
         WHERE status = 'pending'
         ORDER BY created_at ASC
     """)
-    requests = [dict(row) for row in cursor.fetchall()]
+    requests = list(_iter_dicts(cursor))
     conn.close()
     return requests
 
 
 def approve_invite_request(request_id: int, approved_by: Optional[int] = None) -> Optional[str]:
     """Approve an invite request. Returns the email or None if not found. approved_by can be None for auto-approval."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
-    cursor.execute("SELECT email FROM invite_requests WHERE id = ?", (request_id,))
-    row = cursor.fetchone()
-    if not row:
-        conn.close()
-        return None
-
-    email = row['email']
-
-    cursor.execute("""
-        UPDATE invite_requests
-        SET status = 'approved', approved_at = CURRENT_TIMESTAMP, approved_by = ?
-        WHERE id = ?
-    """, (approved_by, request_id))
+    # One atomic UPDATE; the status guard means a request can only be
+    # approved once even if two admins click simultaneously
+    if _HAS_RETURNING:
+        cursor.execute("""
+            UPDATE invite_requests
+            SET status = 'approved', approved_at = CURRENT_TIMESTAMP, approved_by = ?
+            WHERE id = ? AND status != 'approved'
+            RETURNING email
+        """, (approved_by, request_id))
+        row = cursor.fetchone()
+    else:
+        cursor.execute("""
+            SELECT email FROM invite_requests WHERE id = ? AND status != 'approved'
+        """, (request_id,))
+        row = cursor.fetchone()
+        if row:
+            cursor.execute("""
+                UPDATE invite_requests
+                SET status = 'approved', approved_at = CURRENT_TIMESTAMP, approved_by = ?
+                WHERE id = ?
+            """, (approved_by, request_id))
     conn.commit()
     conn.close()
 
-    return email
+    return row['email'] if row else None
 
 
 def reject_invite_request(request_id: int) -> bool:
     """Reject an invite request. Returns True if found."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -1774,7 +2324,7 @@ def reject_invite_request(request_id: int) -> bool:
 
 def get_deck_share(deck_id: int) -> Optional[dict]:
     """Get share settings for a deck."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
     cursor.execute("SELECT * FROM deck_shares WHERE deck_id = ?", (deck_id,))
     row = cursor.fetchone()
@@ -1784,7 +2334,7 @@ def get_deck_share(deck_id: int) -> Optional[dict]:
 
 def set_deck_share(deck_id: int, share_slug: str, is_public: bool) -> int:
     """Set or update share settings for a deck. Returns share ID."""
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -1803,7 +2353,7 @@ def set_deck_share(deck_id: int, share_slug: str, is_public: bool) -> int:
 
 def get_public_deck_by_slug(username: str, share_slug: str) -> Optional[dict]:
     """Get a public deck by username and slug. Returns deck with owner info."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -1821,7 +2371,7 @@ def get_public_deck_by_slug(username: str, share_slug: str) -> Optional[dict]:
 
 def get_public_deck_items(deck_id: int, user_id: int) -> List[dict]:
     """Get saved items in a deck for public display."""
-    conn = get_connection()
+    conn = get_read_connection()
     cursor = conn.cursor()
 
     cursor.execute("""
@@ -1829,10 +2379,10 @@ def get_public_deck_items(deck_id: int, user_id: int) -> List[dict]:
         FROM items i
         JOIN keywords k ON i.keyword_id = k.id
         WHERE k.deck_id = ? AND i.saved = TRUE AND i.user_id = ?
-        ORDER BY i.stars DESC NULLS LAST, i.scraped_at DESC
+        ORDER BY (i.stars IS NULL) ASC, i.stars DESC, i.scraped_at DESC
     """, (deck_id, user_id))
 
-    items = [dict(row) for row in cursor.fetchall()]
+    items = list(_iter_dicts(cursor))
     conn.close()
     return items
 
@@ -1847,7 +2397,7 @@ def migrate_to_multiuser(owner_email: str = "ulokwa@gmail.com"):
     Creates user #1 and assigns all existing data to them.
     Safe to run multiple times (idempotent).
     """
-    conn = get_connection()
+    conn = get_write_connection()
     cursor = conn.cursor()
 
     # Check if user #1 already exists
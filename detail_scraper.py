@@ -5,14 +5,353 @@ Uses Mercari API for Mercari items (fast, no browser needed).
 Uses httpx for Yahoo items (parses __NEXT_DATA__ JSON).
 """
 
+import asyncio
+import functools
 import json
 import re
 import time
-import random
 from typing import Optional
+from urllib.parse import urlsplit
 
 from database import get_connection
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, separators=(',', ':'))
+
+# Per-host politeness: bounded concurrency plus spaced request starts
+_HOST_CONCURRENCY = 8
+_RATE_LIMIT_SECONDS = 0.4
+
+# Give up on pathologically large pages rather than decoding them; the
+# fields we want sit well inside this
+_MAX_BODY_BYTES = 2_000_000
+
+_BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
+    "Accept-Language": "ja-JP,ja;q=0.9",
+}
+
+# Compiled once: these run on every item in a batch
+_MERCARI_ID_RE = re.compile(r'^m\d{11}$')
+_SOLD_RE = re.compile(r'SOLD|売り切れ|売却済み')
+
+
+def _extract_item_id(url: str) -> str:
+    """Last path component of an item URL - cheaper than a regex scan."""
+    return urlsplit(url).path.rstrip('/').rsplit('/', 1)[-1]
+
+
+def _extract_next_data(html: str) -> Optional[str]:
+    """Slice the __NEXT_DATA__ JSON island out of a page.
+
+    str.find on the fixed markers beats running a regex over hundreds of
+    KB of HTML - the island is the only part of the page we care about.
+    """
+    i = html.find('id="__NEXT_DATA__"')
+    if i == -1:
+        return None
+    j = html.find('>', i)
+    if j == -1:
+        return None
+    k = html.find('</script>', j + 1)
+    if k == -1:
+        return None
+    return html[j + 1:k]
+
+
+# Mercari DPOP tokens only carry an iat claim and stay valid well beyond
+# a batch; caching one amortizes the EC signature across all items
+_DPOP_TTL = 300
+_dpop_cache = {"token": None, "exp": 0.0}
+
+# Shared keep-alive client for the sync per-item scrapers: one TLS
+# handshake per host instead of one per item
+_sync_client = None
+
+
+def _get_dpop(url: str, method: str = "GET") -> str:
+    now = time.time()
+    if _dpop_cache["token"] is None or now >= _dpop_cache["exp"] - 30:
+        from mercari_api import generate_dpop
+        _dpop_cache["token"] = generate_dpop(uuid="Mercari Python Bot", method=method, url=url)
+        _dpop_cache["exp"] = now + _DPOP_TTL
+    return _dpop_cache["token"]
+
+
+def _get_sync_client():
+    global _sync_client
+    if _sync_client is None:
+        import atexit
+        import httpx
+        _sync_client = httpx.Client(
+            headers=_BROWSER_HEADERS,
+            follow_redirects=True,
+            timeout=30.0,
+            transport=httpx.HTTPTransport(retries=2),
+        )
+        atexit.register(_sync_client.close)
+    return _sync_client
+
+
+def _fetch_next_data_html(url: str) -> str:
+    """Stream a page and stop reading once the __NEXT_DATA__ script is closed.
+
+    The JSON island usually sits near the top of the page, so this skips
+    downloading and decoding the trailing HTML entirely.
+    """
+    buf = bytearray()
+    marker = -1
+    with _get_sync_client().stream("GET", url) as r:
+        r.raise_for_status()
+        for chunk in r.iter_bytes(65536):
+            buf += chunk
+            if marker == -1:
+                marker = buf.find(b'id="__NEXT_DATA__"')
+            if marker != -1 and buf.find(b'</script>', marker) != -1:
+                break
+            if len(buf) >= _MAX_BODY_BYTES:
+                print(f"Body too large, giving up at {len(buf)} bytes: {url}")
+                break
+    # A break can land mid multi-byte char past the island; ignore it
+    return buf.decode("utf-8", errors="ignore")
+
+
+async def _fetch_next_data_html_async(url: str, client) -> str:
+    """Async variant of _fetch_next_data_html over a shared client."""
+    buf = bytearray()
+    marker = -1
+    async with client.stream("GET", url) as r:
+        r.raise_for_status()
+        async for chunk in r.aiter_bytes(65536):
+            buf += chunk
+            if marker == -1:
+                marker = buf.find(b'id="__NEXT_DATA__"')
+            if marker != -1 and buf.find(b'</script>', marker) != -1:
+                break
+            if len(buf) >= _MAX_BODY_BYTES:
+                print(f"Body too large, giving up at {len(buf)} bytes: {url}")
+                break
+    return buf.decode("utf-8", errors="ignore")
+
+
+def _mercari_sold_status(status: str) -> str:
+    if status == "on_sale":
+        return "available"
+    if status == "trading":
+        return "trading"
+    if status == "sold_out":
+        return "sold"
+    return status or "unknown"
+
+
+def _parse_mercari_shop_html(html: str, result: dict):
+    """Extract shop item fields from the page's __NEXT_DATA__ JSON into result."""
+    blob = _extract_next_data(html)
+    if not blob:
+        return result
+    data = _json_loads(blob)
+    try:
+        item_data = data["props"]["pageProps"]["item"]
+    except (KeyError, TypeError):
+        item_data = {}
+
+    result["description"] = item_data.get("description")
+    result["price"] = item_data.get("price")
+
+    # Extract images - shop items have photos array with imageUrl field
+    photos = item_data.get("photos", [])
+    if photos:
+        result["images"] = [img.get("imageUrl") for img in photos if img.get("imageUrl")][:20]
+
+    result["sold_status"] = _mercari_sold_status(item_data.get("status", ""))
+    return result
+
+
+def _parse_mercari_api_data(item_data: dict, result: dict):
+    """Extract fields from the Mercari items/get API payload into result."""
+    result["description"] = item_data.get('description')
+    result["price"] = item_data.get('price')
+    result["images"] = item_data.get('photos', [])[:20]
+    result["sold_status"] = _mercari_sold_status(item_data.get('status', ''))
+    return result
+
+
+def _parse_yahoo_html(html: str, result: dict):
+    """Extract auction fields from the page's __NEXT_DATA__ JSON into result."""
+    blob = _extract_next_data(html)
+    if not blob:
+        return result
+    data = _json_loads(blob)
+    # Direct indexing: one KeyError on the miss path beats six .get()
+    # calls allocating empty dicts on every page
+    try:
+        item = data["props"]["pageProps"]["initialState"]["item"]["detail"]["item"]
+    except (KeyError, TypeError):
+        return result
+    if not item:
+        return result
+
+    img_list = item.get("img", [])
+    result["images"] = [img["image"] for img in img_list if img.get("image")][:20]
+    result["price"] = item.get("taxinPrice") or item.get("price")
+
+    # Description is an array of strings - join them
+    desc_list = item.get("description", [])
+    if desc_list and isinstance(desc_list, list):
+        result["description"] = "\n".join(desc_list)
+    else:
+        result["description"] = item.get("title")
+
+    # Auction vs Buy-It-Now classification
+    price = item.get("price", 0)
+    bidorbuy = item.get("bidorbuy")
+    result["is_auction"] = not (bidorbuy is not None and bidorbuy == price)
+
+    # End time
+    end_time = item.get("endTime")
+    if end_time:
+        if isinstance(end_time, (int, float)):
+            result["auction_end_time"] = int(end_time / 1000) if end_time > 9999999999 else int(end_time)
+        elif isinstance(end_time, str):
+            try:
+                from datetime import datetime
+                dt = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
+                result["auction_end_time"] = int(dt.timestamp())
+            except:
+                pass
+
+    # Sold status
+    status = item.get("status", "")
+    if status == "open":
+        result["sold_status"] = "available"
+    elif status == "closed":
+        result["sold_status"] = "sold"
+    elif status == "cancelled":
+        result["sold_status"] = "cancelled"
+    else:
+        result["sold_status"] = status or "unknown"
+    return result
+
+
+def _parse_rakuten_html(html: str, result: dict):
+    """Extract Fril item fields from JSON-LD / HTML into result.
+
+    Uses selectolax (C HTML parser, ~20x faster than html.parser) when
+    installed, falling back to BeautifulSoup otherwise.
+    """
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        return _parse_rakuten_soup(html, result)
+
+    tree = HTMLParser(html)
+
+    # Try to extract from JSON-LD structured data first
+    json_ld = tree.css_first('script[type="application/ld+json"]')
+    if json_ld:
+        try:
+            data = _json_loads(json_ld.text())
+            if data.get("@type") == "Product":
+                result["description"] = data.get("description")
+                if data.get("offers", {}).get("price"):
+                    result["price"] = int(data["offers"]["price"])
+                # Check availability from JSON-LD
+                avail = data.get("offers", {}).get("availability", "")
+                if "OutOfStock" in avail or "SoldOut" in avail:
+                    result["sold_status"] = "sold"
+                else:
+                    result["sold_status"] = "available"
+        except (json.JSONDecodeError, KeyError, ValueError):
+            pass
+
+    # Extract description from HTML if not found in JSON-LD
+    if not result["description"]:
+        desc_elem = tree.css_first("div.item__description__line-limited")
+        if desc_elem:
+            result["description"] = desc_elem.text(strip=True)
+
+    # Extract images from sp-image elements (the main gallery)
+    images = []
+    for img in tree.css("img.sp-image"):
+        img_url = img.attributes.get("src")
+        if img_url and img_url not in images and "item_square_dummy" not in img_url:
+            images.append(img_url)
+
+    # Fallback to og:image if no images found
+    if not images:
+        og_img = tree.css_first('meta[property="og:image"]')
+        if og_img and og_img.attributes.get("content"):
+            images.append(og_img.attributes["content"])
+
+    result["images"] = images
+
+    # Check sold status if not determined yet - a substring scan over the
+    # raw HTML, no need to walk the parsed tree for this
+    if not result["sold_status"]:
+        result["sold_status"] = "sold" if _SOLD_RE.search(html) else "available"
+    return result
+
+
+def _parse_rakuten_soup(html: str, result: dict):
+    """BeautifulSoup fallback for environments without selectolax."""
+    from bs4 import BeautifulSoup
+
+    soup = BeautifulSoup(html, "html.parser")
+
+    # Try to extract from JSON-LD structured data first
+    json_ld = soup.select_one('script[type="application/ld+json"]')
+    if json_ld:
+        try:
+            data = _json_loads(json_ld.string)
+            if data.get("@type") == "Product":
+                result["description"] = data.get("description")
+                if data.get("offers", {}).get("price"):
+                    result["price"] = int(data["offers"]["price"])
+                # Check availability from JSON-LD
+                avail = data.get("offers", {}).get("availability", "")
+                if "OutOfStock" in avail or "SoldOut" in avail:
+                    result["sold_status"] = "sold"
+                else:
+                    result["sold_status"] = "available"
+        except (json.JSONDecodeError, KeyError, ValueError):
+            pass
+
+    # Extract description from HTML if not found in JSON-LD
+    if not result["description"]:
+        desc_elem = soup.select_one("div.item__description__line-limited")
+        if desc_elem:
+            result["description"] = desc_elem.get_text(strip=True)
+
+    # Extract images from sp-image elements (the main gallery)
+    images = []
+    for img in soup.select("img.sp-image"):
+        img_url = img.get("src")
+        if img_url and img_url not in images and "item_square_dummy" not in img_url:
+            images.append(img_url)
+
+    # Fallback to og:image if no images found
+    if not images:
+        og_img = soup.select_one('meta[property="og:image"]')
+        if og_img and og_img.get("content"):
+            images.append(og_img["content"])
+
+    result["images"] = images
+
+    # Check sold status if not determined yet - scan the raw HTML rather
+    # than walking every text node in the soup
+    if not result["sold_status"]:
+        result["sold_status"] = "sold" if _SOLD_RE.search(html) else "available"
+    return result
+
 
 def is_mercari_shop_item(item_id: str) -> bool:
     """
@@ -21,7 +360,7 @@ def is_mercari_shop_item(item_id: str) -> bool:
     Regular items: m followed by 11 digits (e.g., m86254101449)
     Shop items: Alphanumeric string NOT matching m\d{11} pattern
     """
-    return not re.match(r'^m\d{11}$', item_id)
+    return not _MERCARI_ID_RE.match(item_id)
 
 
 def scrape_mercari_shop_detail(item_id: str) -> dict:
@@ -32,44 +371,8 @@ def scrape_mercari_shop_detail(item_id: str) -> dict:
     result = {"description": None, "price": None, "images": [], "sold_status": None}
 
     try:
-        import httpx
-
-        url = f"https://jp.mercari.com/shops/product/{item_id}"
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-            "Accept-Language": "ja-JP,ja;q=0.9",
-        }
-
-        with httpx.Client(headers=headers, follow_redirects=True, timeout=15.0) as client:
-            response = client.get(url)
-            response.raise_for_status()
-            html = response.text
-
-        # Parse __NEXT_DATA__ JSON (similar to Yahoo approach)
-        match = re.search(r'<script id="__NEXT_DATA__"[^>]*>([^<]+)</script>', html)
-        if match:
-            data = json.loads(match.group(1))
-            # Extract item details from pageProps
-            item_data = data.get("props", {}).get("pageProps", {}).get("item", {})
-
-            result["description"] = item_data.get("description")
-            result["price"] = item_data.get("price")
-
-            # Extract images - shop items have photos array with imageUrl field
-            photos = item_data.get("photos", [])
-            if photos:
-                result["images"] = [img.get("imageUrl") for img in photos if img.get("imageUrl")][:20]
-
-            # Status
-            status = item_data.get("status", "")
-            if status == "on_sale":
-                result["sold_status"] = "available"
-            elif status == "trading":
-                result["sold_status"] = "trading"
-            elif status == "sold_out":
-                result["sold_status"] = "sold"
-            else:
-                result["sold_status"] = status or "unknown"
+        html = _fetch_next_data_html(f"https://jp.mercari.com/shops/product/{item_id}")
+        _parse_mercari_shop_html(html, result)
 
     except Exception as e:
         print(f"Error fetching Mercari shop item {item_id}: {e}")
@@ -85,53 +388,34 @@ def scrape_mercari_detail(url: str, page=None) -> dict:
     """
     result = {"description": None, "price": None, "images": [], "sold_status": None}
 
-    # Extract item ID from URL - handle both /item/ and /shops/product/ URLs
-    match = re.search(r'/(?:item|shops/product)/([a-zA-Z0-9]+)', url)
-    if not match:
+    # Extract item ID from URL - the last path component for both /item/
+    # and /shops/product/ URLs
+    item_id = _extract_item_id(url)
+    if not item_id:
         print(f"Could not extract item ID from URL: {url}")
         return result
 
-    item_id = match.group(1)
-
     # Route shop/business items to dedicated scraper
     if is_mercari_shop_item(item_id):
         return scrape_mercari_shop_detail(item_id)
 
     try:
-        import requests
-        from mercari_api import generate_dpop
-
         api_url = "https://api.mercari.jp/items/get"
-        dpop = generate_dpop(uuid="Mercari Python Bot", method="GET", url=api_url)
+        dpop = _get_dpop(api_url)
 
         headers = {
             'DPOP': dpop,
             'X-Platform': 'web',
             'Accept': '*/*',
-            'Accept-Encoding': 'deflate, gzip',
             'Content-Type': 'application/json; charset=utf-8',
             'User-Agent': 'python-mercari',
         }
 
-        # No country_code = returns JPY prices without localization
-        r = requests.get(api_url, headers=headers, params={"id": item_id}, timeout=15)
+        # No country_code = returns JPY prices without localization.
+        # Shared client so the API connection stays warm across items.
+        r = _get_sync_client().get(api_url, headers=headers, params={"id": item_id})
         r.raise_for_status()
-        item_data = r.json().get('data', {})
-
-        result["description"] = item_data.get('description')
-        result["price"] = item_data.get('price')
-        result["images"] = item_data.get('photos', [])[:20]
-
-        # Status
-        status = item_data.get('status', '')
-        if status == "on_sale":
-            result["sold_status"] = "available"
-        elif status == "trading":
-            result["sold_status"] = "trading"
-        elif status == "sold_out":
-            result["sold_status"] = "sold"
-        else:
-            result["sold_status"] = status or "unknown"
+        _parse_mercari_api_data(_json_loads(r.content).get('data', {}), result)
 
     except Exception as e:
         print(f"Error fetching Mercari {url}: {e}")
@@ -147,72 +431,7 @@ def scrape_yahoo_detail(url: str, page=None) -> dict:
     result = {"description": None, "price": None, "images": [], "is_auction": False, "auction_end_time": None, "sold_status": None}
 
     try:
-        import httpx
-
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36",
-            "Accept-Language": "ja-JP,ja;q=0.9",
-        }
-
-        with httpx.Client(headers=headers, follow_redirects=True, timeout=15.0) as client:
-            response = client.get(url)
-            response.raise_for_status()
-            html = response.text
-
-        # Extract __NEXT_DATA__ JSON
-        match = re.search(r'<script id="__NEXT_DATA__"[^>]*>([^<]+)</script>', html)
-        if match:
-            data = json.loads(match.group(1))
-            item = (data.get("props", {})
-                       .get("pageProps", {})
-                       .get("initialState", {})
-                       .get("item", {})
-                       .get("detail", {})
-                       .get("item", {}))
-
-            if item:
-                img_list = item.get("img", [])
-                result["images"] = [img["image"] for img in img_list if img.get("image")][:20]
-                result["price"] = item.get("taxinPrice") or item.get("price")
-
-                # Description is an array of strings - join them
-                desc_list = item.get("description", [])
-                if desc_list and isinstance(desc_list, list):
-                    result["description"] = "\n".join(desc_list)
-                else:
-                    result["description"] = item.get("title")
-
-                # Auction vs Buy-It-Now classification
-                price = item.get("price", 0)
-                bidorbuy = item.get("bidorbuy")
-                if bidorbuy is not None and bidorbuy == price:
-                    result["is_auction"] = False
-                else:
-                    result["is_auction"] = True
-
-                # End time
-                end_time = item.get("endTime")
-                if end_time:
-                    if isinstance(end_time, (int, float)):
-                        result["auction_end_time"] = int(end_time / 1000) if end_time > 9999999999 else int(end_time)
-                    elif isinstance(end_time, str):
-                        try:
-                            from datetime import datetime
-                            dt = datetime.fromisoformat(end_time.replace('Z', '+00:00'))
-                            result["auction_end_time"] = int(dt.timestamp())
-                        except:
-                            pass
-
-                # Sold status
-                status = item.get("status", "")
-                if status == "open":
-                    result["sold_status"] = "available"
-                elif status == "closed":
-                    result["sold_status"] = "sold"
-                elif status == "cancelled":
-                    result["sold_status"] = "cancelled"
-                else:
-                    result["sold_status"] = status or "unknown"
+        _parse_yahoo_html(_fetch_next_data_html(url), result)
 
     except Exception as e:
         print(f"Error fetching Yahoo {url}: {e}")
@@ -228,70 +447,15 @@ def scrape_rakuten_detail(url: str, page=None) -> dict:
     result = {"description": None, "price": None, "images": [], "sold_status": None}
 
     try:
-        import httpx
-        import json
-        from bs4 import BeautifulSoup
-
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-            "Accept-Language": "ja-JP,ja;q=0.9",
-        }
+        response = _get_sync_client().get(url)
+        if response.status_code != 200:
+            print(f"Error fetching Rakuten {url}: Status {response.status_code}")
+            return result
+        if int(response.headers.get("content-length") or 0) > _MAX_BODY_BYTES:
+            print(f"Rakuten page too large, skipping: {url}")
+            return result
 
-        with httpx.Client(headers=headers, follow_redirects=True, timeout=30.0) as client:
-            response = client.get(url)
-            if response.status_code != 200:
-                print(f"Error fetching Rakuten {url}: Status {response.status_code}")
-                return result
-
-            soup = BeautifulSoup(response.text, "html.parser")
-
-            # Try to extract from JSON-LD structured data first
-            json_ld = soup.select_one('script[type="application/ld+json"]')
-            if json_ld:
-                try:
-                    data = json.loads(json_ld.string)
-                    if data.get("@type") == "Product":
-                        result["description"] = data.get("description")
-                        if data.get("offers", {}).get("price"):
-                            result["price"] = int(data["offers"]["price"])
-                        # Check availability from JSON-LD
-                        avail = data.get("offers", {}).get("availability", "")
-                        if "OutOfStock" in avail or "SoldOut" in avail:
-                            result["sold_status"] = "sold"
-                        else:
-                            result["sold_status"] = "available"
-                except (json.JSONDecodeError, KeyError, ValueError):
-                    pass
-
-            # Extract description from HTML if not found in JSON-LD
-            if not result["description"]:
-                desc_elem = soup.select_one("div.item__description__line-limited")
-                if desc_elem:
-                    result["description"] = desc_elem.get_text(strip=True)
-
-            # Extract images from sp-image elements (the main gallery)
-            images = []
-            for img in soup.select("img.sp-image"):
-                img_url = img.get("src")
-                if img_url and img_url not in images and "item_square_dummy" not in img_url:
-                    images.append(img_url)
-
-            # Fallback to og:image if no images found
-            if not images:
-                og_img = soup.select_one('meta[property="og:image"]')
-                if og_img and og_img.get("content"):
-                    images.append(og_img["content"])
-
-            result["images"] = images
-
-            # Check sold status from HTML if not determined yet
-            if not result["sold_status"]:
-                # Look for sold indicators
-                sold_text = soup.find(string=re.compile(r'SOLD|売り切れ|売却済み'))
-                if sold_text:
-                    result["sold_status"] = "sold"
-                else:
-                    result["sold_status"] = "available"
+        _parse_rakuten_html(response.text, result)
 
     except Exception as e:
         print(f"Error fetching Rakuten {url}: {e}")
@@ -324,82 +488,365 @@ def scrape_item_detail(item: dict, page=None) -> dict:
         return {"description": None, "price": None, "images": []}
 
 
-def update_item_details(item_id: int, details: dict):
-    """
-    Update an item in the database with scraped details.
-    """
-    conn = get_connection()
-    cursor = conn.cursor()
+async def scrape_mercari_shop_detail_async(item_id: str, client) -> dict:
+    """Async variant of scrape_mercari_shop_detail using a shared client."""
+    result = {"description": None, "price": None, "images": [], "sold_status": None}
+    try:
+        html = await _fetch_next_data_html_async(f"https://jp.mercari.com/shops/product/{item_id}", client)
+        _parse_mercari_shop_html(html, result)
+    except Exception as e:
+        print(f"Error fetching Mercari shop item {item_id}: {e}")
+    return result
 
-    images_json = json.dumps(details.get("images", []))
 
-    # Build dynamic update query based on what fields we have
-    update_parts = ["description = ?", "images = ?"]
-    params = [details.get("description"), images_json]
+async def scrape_mercari_detail_async(url: str, client) -> dict:
+    """Async variant of scrape_mercari_detail using a shared client."""
+    result = {"description": None, "price": None, "images": [], "sold_status": None}
+
+    item_id = _extract_item_id(url)
+    if not item_id:
+        print(f"Could not extract item ID from URL: {url}")
+        return result
+    if is_mercari_shop_item(item_id):
+        return await scrape_mercari_shop_detail_async(item_id, client)
 
+    try:
+        api_url = "https://api.mercari.jp/items/get"
+        dpop = _get_dpop(api_url)
+        headers = {
+            'DPOP': dpop,
+            'X-Platform': 'web',
+            'Accept': '*/*',
+            'Content-Type': 'application/json; charset=utf-8',
+            'User-Agent': 'python-mercari',
+        }
+
+        r = await client.get(api_url, headers=headers, params={"id": item_id})
+        r.raise_for_status()
+        _parse_mercari_api_data(_json_loads(r.content).get('data', {}), result)
+
+    except Exception as e:
+        print(f"Error fetching Mercari {url}: {e}")
+
+    return result
+
+
+async def scrape_yahoo_detail_async(url: str, client) -> dict:
+    """Async variant of scrape_yahoo_detail using a shared client."""
+    result = {"description": None, "price": None, "images": [], "is_auction": False, "auction_end_time": None, "sold_status": None}
+    try:
+        _parse_yahoo_html(await _fetch_next_data_html_async(url, client), result)
+    except Exception as e:
+        print(f"Error fetching Yahoo {url}: {e}")
+    return result
+
+
+async def scrape_rakuten_detail_async(url: str, client) -> dict:
+    """Async variant of scrape_rakuten_detail using a shared client."""
+    result = {"description": None, "price": None, "images": [], "sold_status": None}
+    try:
+        response = await client.get(url)
+        if response.status_code != 200:
+            print(f"Error fetching Rakuten {url}: Status {response.status_code}")
+            return result
+        if int(response.headers.get("content-length") or 0) > _MAX_BODY_BYTES:
+            print(f"Rakuten page too large, skipping: {url}")
+            return result
+        _parse_rakuten_html(response.text, result)
+    except Exception as e:
+        print(f"Error fetching Rakuten {url}: {e}")
+    return result
+
+
+async def scrape_item_detail_async(item: dict, client) -> dict:
+    """Async dispatch by source, mirroring scrape_item_detail."""
+    source = item.get('source', '')
+    url = item.get('url', '')
+
+    if source == 'mercari':
+        return await scrape_mercari_detail_async(url, client)
+    elif source == 'yahoo':
+        return await scrape_yahoo_detail_async(url, client)
+    elif source == 'rakuten':
+        return await scrape_rakuten_detail_async(url, client)
+    else:
+        print(f"Unknown source: {source}")
+        return {"description": None, "price": None, "images": []}
+
+
+@functools.lru_cache(maxsize=16)
+def _details_update_sql(has_price: bool, has_sold: bool, has_auction: bool,
+                        has_end_time: bool) -> Optional[str]:
+    """Build the items UPDATE for a field combination, cached per variant.
+
+    Within a batch most items hit the same variant, so the repeated
+    string-building goes away and SQLite keeps reusing the same prepared
+    statement from its cache.
+    """
+    update_parts = []
     # Only update price if we got a new one and don't have one
-    if details.get("price"):
+    if has_price:
         update_parts.append("price = COALESCE(price, ?)")
-        params.append(details.get("price"))
+    if has_sold:
+        update_parts.append("sold_status = ?")
+    if has_auction:
+        update_parts.append("is_auction = ?")
+    if has_end_time:
+        update_parts.append("auction_end_time = ?")
+    if not update_parts:
+        return None
+    return f"UPDATE items SET {', '.join(update_parts)} WHERE id = ?"
 
-    # Update sold_status if present
+
+def _apply_item_details(cursor, item_id: int, details: dict):
+    """Write one item's scraped details using an existing cursor (no commit)."""
+    _display_cache.pop(item_id, None)
+    images_json = _json_dumps(details.get("images", []))
+
+    # Description/images live in the item_details side table
+    cursor.execute("""
+        INSERT OR REPLACE INTO item_details (item_id, description, images)
+        VALUES (?, ?, ?)
+    """, (item_id, details.get("description"), images_json))
+
+    # Collect the remaining item fields; is_auction/end_time are Yahoo-only
+    params = []
+    if details.get("price"):
+        params.append(details.get("price"))
     if details.get("sold_status"):
-        update_parts.append("sold_status = ?")
         params.append(details.get("sold_status"))
-
-    # Update is_auction if present (for Yahoo)
-    if "is_auction" in details and details.get("is_auction") is not None:
-        update_parts.append("is_auction = ?")
+    has_auction = "is_auction" in details and details.get("is_auction") is not None
+    if has_auction:
         params.append(1 if details.get("is_auction") else 0)
-
-    # Update auction_end_time if present (for Yahoo)
     if details.get("auction_end_time"):
-        update_parts.append("auction_end_time = ?")
         params.append(details.get("auction_end_time"))
 
-    params.append(item_id)
+    sql = _details_update_sql(bool(details.get("price")),
+                              bool(details.get("sold_status")),
+                              has_auction,
+                              bool(details.get("auction_end_time")))
+    if sql:
+        params.append(item_id)
+        cursor.execute(sql, params)
 
-    cursor.execute(f"""
-        UPDATE items
-        SET {', '.join(update_parts)}
-        WHERE id = ?
-    """, params)
 
+def update_item_details(item_id: int, details: dict):
+    """
+    Update an item in the database with scraped details.
+    """
+    conn = get_connection()
+    _apply_item_details(conn.cursor(), item_id, details)
     conn.commit()
     conn.close()
 
 
-def get_items_needing_details(limit: int = 100, source: str = None) -> list:
+# Keep CASE WHEN batches under SQLite's default 999-variable limit:
+# 2 params per row per field (up to 4 fields) plus the IN-list id
+_CASE_UPDATE_CHUNK = 100
+
+
+def _details_variant(details: dict) -> tuple:
+    return (bool(details.get("price")),
+            bool(details.get("sold_status")),
+            "is_auction" in details and details.get("is_auction") is not None,
+            bool(details.get("auction_end_time")))
+
+
+def _build_case_update(variant: tuple, group: list):
+    """One UPDATE ... CASE id WHEN ... statement for a same-variant group."""
+    has_price, has_sold, has_auction, has_end_time = variant
+    whens = " ".join("WHEN ? THEN ?" for _ in group)
+    set_parts = []
+    params = []
+    if has_price:
+        set_parts.append(f"price = COALESCE(price, CASE id {whens} END)")
+        for item_id, details in group:
+            params += [item_id, details.get("price")]
+    if has_sold:
+        set_parts.append(f"sold_status = CASE id {whens} END")
+        for item_id, details in group:
+            params += [item_id, details.get("sold_status")]
+    if has_auction:
+        set_parts.append(f"is_auction = CASE id {whens} END")
+        for item_id, details in group:
+            params += [item_id, 1 if details.get("is_auction") else 0]
+    if has_end_time:
+        set_parts.append(f"auction_end_time = CASE id {whens} END")
+        for item_id, details in group:
+            params += [item_id, details.get("auction_end_time")]
+    placeholders = ",".join("?" * len(group))
+    params += [item_id for item_id, _ in group]
+    return f"UPDATE items SET {', '.join(set_parts)} WHERE id IN ({placeholders})", params
+
+
+def update_item_details_bulk(rows: list):
     """
-    Get items that don't have description or images yet.
+    Write scraped details for many items in one transaction.
+
+    rows is a list of (item_id, details) pairs. The detail rows go in via
+    one executemany, and the items table gets one UPDATE ... CASE WHEN
+    statement per field-combination group - one commit and one B-tree
+    traversal per row instead of a statement dispatch per item.
     """
+    if not rows:
+        return
     conn = get_connection()
-    cursor = conn.cursor()
+    try:
+        cursor = conn.cursor()
+        for item_id, _ in rows:
+            _display_cache.pop(item_id, None)
+
+        cursor.executemany("""
+            INSERT OR REPLACE INTO item_details (item_id, description, images)
+            VALUES (?, ?, ?)
+        """, [(item_id, details.get("description"), _json_dumps(details.get("images", [])))
+              for item_id, details in rows])
+
+        groups = {}
+        for item_id, details in rows:
+            groups.setdefault(_details_variant(details), []).append((item_id, details))
+        for variant, group in groups.items():
+            if not any(variant):
+                continue
+            for i in range(0, len(group), _CASE_UPDATE_CHUNK):
+                sql, params = _build_case_update(variant, group[i:i + _CASE_UPDATE_CHUNK])
+                cursor.execute(sql, params)
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def _record_scrape_attempts(item_ids: list):
+    """Bump the failure counter for items whose scrape came back empty.
+
+    After three strikes an item sits out of get_items_needing_details for
+    a week instead of wasting a request every batch.
+    """
+    if not item_ids:
+        return
+    conn = get_connection()
+    try:
+        conn.cursor().executemany("""
+            UPDATE items
+            SET scrape_attempts = scrape_attempts + 1,
+                last_scrape_at = CURRENT_TIMESTAMP
+            WHERE id = ?
+        """, [(iid,) for iid in item_ids])
+        conn.commit()
+    finally:
+        conn.close()
+
+
+def iter_items_needing_details(limit: int = 100, source: str = None, chunk: int = 64):
+    """
+    Yield items that don't have description or images yet.
 
-    query = """
-        SELECT id, source, source_id, url, title
-        FROM items
-        WHERE (description IS NULL OR description = '' OR images IS NULL OR images = '' OR images = '[]')
+    Rows come out of SQLite in fetchmany chunks instead of one big
+    fetchall, so a large limit never materializes every row dict before
+    the caller starts working. The pooled connection is released when
+    the generator is exhausted or closed.
     """
-    params = []
+    conn = get_connection()
+    try:
+        cursor = conn.cursor()
+
+        query = """
+            SELECT i.id, i.source, i.source_id, i.url, i.title
+            FROM items i
+            LEFT JOIN item_details d ON d.item_id = i.id
+            WHERE (d.description IS NULL OR d.description = '' OR d.images IS NULL OR d.images = '' OR d.images = '[]')
+              AND (i.scrape_attempts < 3 OR i.last_scrape_at < datetime('now', '-7 days'))
+        """
+        params = []
+
+        if source:
+            query += " AND i.source = ?"
+            params.append(source)
+
+        query += " ORDER BY i.scraped_at DESC LIMIT ?"
+        params.append(limit)
+
+        cursor.execute(query, params)
+        while True:
+            rows = cursor.fetchmany(chunk)
+            if not rows:
+                break
+            for row in rows:
+                yield dict(row)
+    finally:
+        conn.close()
+
+
+def get_items_needing_details(limit: int = 100, source: str = None) -> list:
+    """
+    Get items that don't have description or images yet.
+    """
+    return list(iter_items_needing_details(limit, source))
 
-    if source:
-        query += " AND source = ?"
-        params.append(source)
 
-    query += " ORDER BY scraped_at DESC LIMIT ?"
-    params.append(limit)
+async def _scrape_details_async(items: list) -> int:
+    """Scrape all items concurrently over one shared AsyncClient.
 
-    cursor.execute(query, params)
-    items = [dict(row) for row in cursor.fetchall()]
-    conn.close()
-    return items
+    Concurrency is bounded per source host by a semaphore, with the
+    politeness delay held inside the slot so each host still sees at most
+    _HOST_CONCURRENCY in-flight requests spaced by the old rate limit.
+    """
+    import httpx
+
+    semaphores = {}
+    rate_locks = {}
+    last_request_at = {}
+
+    async def scrape_one(item, client):
+        source = item.get('source', '')
+        sem = semaphores.setdefault(source, asyncio.Semaphore(_HOST_CONCURRENCY))
+        async with sem:
+            # Rate limit per host: space request starts on the same host
+            # instead of sleeping after every item regardless of source
+            async with rate_locks.setdefault(source, asyncio.Lock()):
+                wait = _RATE_LIMIT_SECONDS - (time.monotonic() - last_request_at.get(source, 0.0))
+                if wait > 0:
+                    await asyncio.sleep(wait)
+                last_request_at[source] = time.monotonic()
+            try:
+                details = await scrape_item_detail_async(item, client)
+            except Exception as e:
+                print(f"Error on item {item['id']}: {e}")
+                return None
+        return details
+
+    limits = httpx.Limits(max_connections=20, max_keepalive_connections=20)
+    async with httpx.AsyncClient(headers=_BROWSER_HEADERS, follow_redirects=True,
+                                 timeout=15.0, limits=limits) as client:
+        results = await asyncio.gather(*(scrape_one(item, client) for item in items))
+
+    # Flush writes in chunks so a long batch commits as a few
+    # transactions rather than one fsync per item
+    updated = 0
+    pending = []
+    failed_ids = []
+    for item, details in zip(items, results):
+        if details and (details.get("description") or details.get("images")):
+            pending.append((item["id"], details))
+            updated += 1
+            if len(pending) >= 50:
+                update_item_details_bulk(pending)
+                pending = []
+        else:
+            failed_ids.append(item["id"])
+    update_item_details_bulk(pending)
+    _record_scrape_attempts(failed_ids)
+    return updated
 
 
 def scrape_details_batch(items: list = None, limit: int = 100, source: str = None) -> int:
     """
     Scrape details for multiple items using API/HTTP (no browser needed).
 
+    The batch is fetched concurrently (bounded per host) over a single
+    shared connection pool; the work is network-latency-bound, so this is
+    close to _HOST_CONCURRENCY times faster than the old serial loop.
+
     Args:
         items: Optional list of items to scrape. If None, fetches from DB.
         limit: Max items to process
@@ -408,8 +855,6 @@ def scrape_details_batch(items: list = None, limit: int = 100, source: str = Non
     Returns:
         Number of items updated
     """
-    from tqdm import tqdm
-
     if items is None:
         items = get_items_needing_details(limit, source)
 
@@ -418,24 +863,7 @@ def scrape_details_batch(items: list = None, limit: int = 100, source: str = Non
         return 0
 
     print(f"Scraping details for {len(items)} items...")
-
-    updated = 0
-
-    for item in tqdm(items, desc="Scraping details"):
-        try:
-            details = scrape_item_detail(item)
-
-            if details.get("description") or details.get("images"):
-                update_item_details(item["id"], details)
-                updated += 1
-
-            # Rate limit - be gentle with APIs
-            time.sleep(0.3 + random.random() * 0.2)
-
-        except Exception as e:
-            print(f"Error on item {item['id']}: {e}")
-            continue
-
+    updated = asyncio.run(_scrape_details_async(items))
     print(f"Updated {updated} items with details")
     return updated
 
@@ -447,7 +875,14 @@ def get_item_with_details(item_id: int) -> Optional[dict]:
     conn = get_connection()
     cursor = conn.cursor()
 
-    cursor.execute("SELECT * FROM items WHERE id = ?", (item_id,))
+    cursor.execute("""
+        SELECT i.id, i.source, i.source_id, i.title, i.price, i.url,
+               i.sold_status, i.is_auction, i.auction_end_time,
+               d.description, d.images
+        FROM items i
+        LEFT JOIN item_details d ON d.item_id = i.id
+        WHERE i.id = ?
+    """, (item_id,))
     row = cursor.fetchone()
     conn.close()
 
@@ -459,7 +894,7 @@ def get_item_with_details(item_id: int) -> Optional[dict]:
     # Parse images JSON
     if item.get("images"):
         try:
-            item["images"] = json.loads(item["images"])
+            item["images"] = _json_loads(item["images"])
         except:
             item["images"] = []
     else:
@@ -468,6 +903,38 @@ def get_item_with_details(item_id: int) -> Optional[dict]:
     return item
 
 
+# Built display dicts are stable between detail writes, so cache them per
+# item id and drop an entry whenever its row is rewritten (same approach
+# as the keyword info cache in database.py)
+_display_cache = {}
+_DISPLAY_CACHE_MAX = 4096
+
+
+def invalidate_display_cache(item_id: int):
+    """Drop a cached display dict after a details write outside this module."""
+    _display_cache.pop(item_id, None)
+
+
+def _build_display(item_id, title, description, price, url, source, images) -> dict:
+    display = {
+        "id": item_id,
+        "title": title,
+        "description": description,
+        "price": f"¥{price:,}" if price else "",
+        "url": url,
+        "source": source,
+    }
+
+    # Add individual image URLs
+    for i, img_url in enumerate(images[:20], start=1):
+        display[f"img_url_{i}"] = img_url
+
+    if len(_display_cache) >= _DISPLAY_CACHE_MAX:
+        _display_cache.clear()
+    _display_cache[item_id] = display
+    return display
+
+
 def get_item_display_data(item_id: int) -> Optional[dict]:
     """
     Get item data formatted for display on the page.
@@ -478,25 +945,17 @@ def get_item_display_data(item_id: int) -> Optional[dict]:
             - price: str (formatted with yen symbol)
             - img_url_1 through img_url_N: individual image URLs
     """
+    cached = _display_cache.get(item_id)
+    if cached is not None:
+        return cached
+
     item = get_item_with_details(item_id)
     if not item:
         return None
 
-    result = {
-        "id": item["id"],
-        "title": item.get("title", ""),
-        "description": item.get("description", ""),
-        "price": f"¥{item['price']:,}" if item.get("price") else "",
-        "url": item.get("url", ""),
-        "source": item.get("source", ""),
-    }
-
-    # Add individual image URLs
-    images = item.get("images", [])
-    for i, img_url in enumerate(images[:20], start=1):
-        result[f"img_url_{i}"] = img_url
-
-    return result
+    return _build_display(item["id"], item.get("title"), item.get("description"),
+                          item.get("price"), item.get("url"), item.get("source"),
+                          item.get("images", []))
 
 
 def get_items_display_data(item_ids: list = None, limit: int = 50) -> list:
@@ -510,52 +969,57 @@ def get_items_display_data(item_ids: list = None, limit: int = 50) -> list:
     Returns:
         List of item display dicts
     """
-    conn = get_connection()
-    cursor = conn.cursor()
-
+    # Known-id lists: serve cached display dicts and only hit the DB for
+    # the ids not seen since their last detail write
     if item_ids:
-        placeholders = ",".join("?" * len(item_ids))
+        results = []
+        missing = []
+        for iid in item_ids[:limit]:
+            cached = _display_cache.get(iid)
+            if cached is not None and cached.get("description") is not None:
+                results.append(cached)
+            else:
+                missing.append(iid)
+        if not missing:
+            return results
+
+        conn = get_connection()
+        cursor = conn.cursor()
+        placeholders = ",".join("?" * len(missing))
         cursor.execute(f"""
-            SELECT * FROM items
-            WHERE id IN ({placeholders}) AND description IS NOT NULL
+            SELECT i.id, i.title, i.price, i.url, i.source, d.description, d.images
+            FROM items i
+            JOIN item_details d ON d.item_id = i.id
+            WHERE i.id IN ({placeholders}) AND d.description IS NOT NULL
             LIMIT ?
-        """, item_ids + [limit])
+        """, missing + [limit])
     else:
+        results = []
+        conn = get_connection()
+        cursor = conn.cursor()
         cursor.execute("""
-            SELECT * FROM items
-            WHERE description IS NOT NULL AND description != ''
-            ORDER BY scraped_at DESC
+            SELECT i.id, i.title, i.price, i.url, i.source, d.description, d.images
+            FROM items i
+            JOIN item_details d ON d.item_id = i.id
+            WHERE d.description IS NOT NULL AND d.description != ''
+            ORDER BY i.scraped_at DESC
             LIMIT ?
         """, (limit,))
 
+    # Positional unpacking: no sqlite3.Row -> dict conversion per row
+    cursor.row_factory = None
     rows = cursor.fetchall()
     conn.close()
 
-    results = []
-    for row in rows:
-        item = dict(row)
-
-        # Parse images
+    for iid, title, price, url, source, description, images_json in rows:
         images = []
-        if item.get("images"):
+        if images_json:
             try:
-                images = json.loads(item["images"])
+                images = _json_loads(images_json)
             except:
                 pass
 
-        display = {
-            "id": item["id"],
-            "title": item.get("title", ""),
-            "description": item.get("description", ""),
-            "price": f"¥{item['price']:,}" if item.get("price") else "",
-            "url": item.get("url", ""),
-            "source": item.get("source", ""),
-        }
-
-        for i, img_url in enumerate(images[:20], start=1):
-            display[f"img_url_{i}"] = img_url
-
-        results.append(display)
+        results.append(_build_display(iid, title, description, price, url, source, images))
 
     return results
 
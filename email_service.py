@@ -3,12 +3,103 @@ Email service using Resend API via httpx.
 100 free emails/day on free tier.
 """
 import os
+import string
+import threading
 import httpx
+from concurrent.futures import ThreadPoolExecutor
 
 RESEND_API_KEY = os.environ.get('RESEND_API_KEY')
 FROM_EMAIL = os.environ.get('FROM_EMAIL', 'TAPIERE <onboarding@resend.dev>')
 BASE_URL = os.environ.get('BASE_URL', 'http://localhost:8000').rstrip('/')
 
+# All emails share one shell; only the heading and body vary. Rendering
+# from pre-built templates avoids rebuilding ~20 lines of HTML per send.
+_BASE_TPL = string.Template("""
+<!DOCTYPE html>
+<html>
+<head>
+    <style>
+        body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #333; }
+        .container { max-width: 500px; margin: 0 auto; padding: 40px 20px; }
+        h1 { color: #1a1a1a; margin-bottom: 20px; }
+        .button { display: inline-block; background: #000; color: #fff; padding: 12px 24px; text-decoration: none; border-radius: 6px; margin: 20px 0; }
+        .footer { color: #666; font-size: 14px; margin-top: 40px; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <h1>$heading</h1>
+        $body_html
+    </div>
+</body>
+</html>
+""")
+
+
+def _magic_tpl(heading: str, intro: str, button_label: str) -> string.Template:
+    """Bake heading/intro into the base shell, leaving only $link to fill."""
+    body = (
+        f"<p>{intro}</p>\n"
+        f'        <a href="$link" class="button">{button_label}</a>\n'
+        "        <p class=\"footer\">This link expires in 24 hours.<br>"
+        "If you didn't request this, you can ignore this email.</p>"
+    )
+    return string.Template(_BASE_TPL.safe_substitute(heading=heading, body_html=body))
+
+
+_MAGIC_LOGIN_TPL = _magic_tpl(
+    "Sign in to TAPIERE",
+    "Click the button below to sign in:",
+    "Sign in",
+)
+_MAGIC_INVITE_TPL = _magic_tpl(
+    "Welcome to TAPIERE!",
+    "Your invite request has been approved. Click the button below to get started:",
+    "Sign in to TAPIERE",
+)
+
+_CONFIRMATION_HTML = _BASE_TPL.substitute(
+    heading="Thanks for your interest!",
+    body_html=(
+        "<p>We've received your invite request for TAPIERE. "
+        "We'll send you a link when you're approved.</p>\n"
+        "        <p class=\"footer\">In the meantime, you can try out the demo "
+        "on our landing page.</p>"
+    ),
+)
+
+
+def _magic_link_email(token: str, link_type: str):
+    """Return (subject, html, link) for a magic-link email."""
+    link = f"{BASE_URL}/auth/verify?token={token}"
+    if link_type == 'invite':
+        subject = "You're in! Welcome to TAPIERE"
+        html = _MAGIC_INVITE_TPL.substitute(link=link)
+    else:
+        subject = "Sign in to TAPIERE"
+        html = _MAGIC_LOGIN_TPL.substitute(link=link)
+    return subject, html, link
+
+
+# One keep-alive client for api.resend.com - httpx.post opens and tears
+# down a TLS connection per call, which dominates send latency
+_client = None
+
+
+def _get_client():
+    global _client
+    if _client is None:
+        import atexit
+        _client = httpx.Client(
+            headers={
+                "Authorization": f"Bearer {RESEND_API_KEY}",
+                "Content-Type": "application/json",
+            },
+            timeout=10,
+        )
+        atexit.register(_client.close)
+    return _client
+
 
 def _send_email(to: str, subject: str, html: str):
     """Send email via Resend API using httpx."""
@@ -17,19 +108,14 @@ def _send_email(to: str, subject: str, html: str):
         return False
 
     try:
-        response = httpx.post(
+        response = _get_client().post(
             "https://api.resend.com/emails",
-            headers={
-                "Authorization": f"Bearer {RESEND_API_KEY}",
-                "Content-Type": "application/json",
-            },
             json={
                 "from": FROM_EMAIL,
                 "to": [to],
                 "subject": subject,
                 "html": html,
             },
-            timeout=10,
         )
         response.raise_for_status()
         print(f"[Email] Sent to {to}: {subject}")
@@ -41,7 +127,7 @@ def _send_email(to: str, subject: str, html: str):
 
 def send_magic_link(email: str, token: str, link_type: str = 'login'):
     """Send magic link email."""
-    link = f"{BASE_URL}/auth/verify?token={token}"
+    subject, html, link = _magic_link_email(token, link_type)
 
     if not RESEND_API_KEY:
         print(f"\n{'='*50}")
@@ -50,87 +136,103 @@ def send_magic_link(email: str, token: str, link_type: str = 'login'):
         print(f"{'='*50}\n")
         return
 
-    if link_type == 'invite':
-        subject = "You're in! Welcome to TAPIERE"
-        html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #333; }}
-        .container {{ max-width: 500px; margin: 0 auto; padding: 40px 20px; }}
-        h1 {{ color: #1a1a1a; margin-bottom: 20px; }}
-        .button {{ display: inline-block; background: #000; color: #fff; padding: 12px 24px; text-decoration: none; border-radius: 6px; margin: 20px 0; }}
-        .footer {{ color: #666; font-size: 14px; margin-top: 40px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Welcome to TAPIERE!</h1>
-        <p>Your invite request has been approved. Click the button below to get started:</p>
-        <a href="{link}" class="button">Sign in to TAPIERE</a>
-        <p class="footer">This link expires in 24 hours.<br>If you didn't request this, you can ignore this email.</p>
-    </div>
-</body>
-</html>
-        """
-    else:
-        subject = "Sign in to TAPIERE"
-        html = f"""
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body {{ font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #333; }}
-        .container {{ max-width: 500px; margin: 0 auto; padding: 40px 20px; }}
-        h1 {{ color: #1a1a1a; margin-bottom: 20px; }}
-        .button {{ display: inline-block; background: #000; color: #fff; padding: 12px 24px; text-decoration: none; border-radius: 6px; margin: 20px 0; }}
-        .footer {{ color: #666; font-size: 14px; margin-top: 40px; }}
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Sign in to TAPIERE</h1>
-        <p>Click the button below to sign in:</p>
-        <a href="{link}" class="button">Sign in</a>
-        <p class="footer">This link expires in 24 hours.<br>If you didn't request this, you can ignore this email.</p>
-    </div>
-</body>
-</html>
-        """
-
     if not _send_email(email, subject, html):
         # Fallback to console
         print(f"[Email] Magic link: {link}")
 
 
+# Background sending: the Resend round-trip takes hundreds of ms, and
+# auth handlers shouldn't wait for it. A small worker pool drains sends
+# off the request path; the pending counter caps queue growth so a
+# Resend outage fails fast instead of buffering emails without bound.
+_MAX_PENDING = 1000
+_EMAIL_EXECUTOR = ThreadPoolExecutor(max_workers=4, thread_name_prefix='email')
+_pending_lock = threading.Lock()
+_pending = 0
+_pending_high_water = 0
+
+
+class EmailBacklogError(Exception):
+    """Raised when the background email queue is full."""
+
+
+def _submit_email(fn, *args):
+    global _pending, _pending_high_water
+    with _pending_lock:
+        if _pending >= _MAX_PENDING:
+            raise EmailBacklogError(f"{_pending} emails already queued")
+        _pending += 1
+        if _pending > _pending_high_water:
+            _pending_high_water = _pending
+            print(f"[Email] Queue high-water mark: {_pending_high_water}")
+
+    def done(_future):
+        global _pending
+        with _pending_lock:
+            _pending -= 1
+
+    _EMAIL_EXECUTOR.submit(fn, *args).add_done_callback(done)
+
+
+def send_magic_link_async(email: str, token: str, link_type: str = 'login'):
+    """Queue a magic link email; returns once queued, not once sent."""
+    _submit_email(send_magic_link, email, token, link_type)
+
+
+def send_invite_confirmation_async(email: str):
+    """Queue an invite confirmation email."""
+    _submit_email(send_invite_confirmation, email)
+
+
+# Resend's batch endpoint takes up to 100 emails per request
+_BATCH_SIZE = 100
+
+
+def send_magic_links_bulk(recipients):
+    """
+    Send many magic-link emails in batched requests.
+
+    Args:
+        recipients: list of (email, token, link_type) tuples
+
+    Returns:
+        Number of emails accepted by the API.
+    """
+    if not RESEND_API_KEY:
+        for email, token, link_type in recipients:
+            send_magic_link(email, token, link_type)
+        return 0
+
+    payload = []
+    for email, token, link_type in recipients:
+        subject, html, _link = _magic_link_email(token, link_type)
+        payload.append({
+            "from": FROM_EMAIL,
+            "to": [email],
+            "subject": subject,
+            "html": html,
+        })
+
+    sent = 0
+    for start in range(0, len(payload), _BATCH_SIZE):
+        chunk = payload[start:start + _BATCH_SIZE]
+        try:
+            response = _get_client().post(
+                "https://api.resend.com/emails/batch",
+                json=chunk,
+            )
+            response.raise_for_status()
+            sent += len(chunk)
+            print(f"[Email] Batch sent {len(chunk)} magic links")
+        except Exception as e:
+            print(f"[Email] Batch send error ({len(chunk)} emails): {e}")
+    return sent
+
+
 def send_invite_confirmation(email: str):
     """Send confirmation that invite request was received."""
     if not RESEND_API_KEY:
         print(f"[Email] Invite confirmation for {email}: You're on the waitlist!")
         return
 
-    _send_email(
-        email,
-        "TAPIERE - You're on the waitlist!",
-        """
-<!DOCTYPE html>
-<html>
-<head>
-    <style>
-        body { font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, sans-serif; line-height: 1.6; color: #333; }
-        .container { max-width: 500px; margin: 0 auto; padding: 40px 20px; }
-        h1 { color: #1a1a1a; margin-bottom: 20px; }
-        .footer { color: #666; font-size: 14px; margin-top: 40px; }
-    </style>
-</head>
-<body>
-    <div class="container">
-        <h1>Thanks for your interest!</h1>
-        <p>We've received your invite request for TAPIERE. We'll send you a link when you're approved.</p>
-        <p class="footer">In the meantime, you can try out the demo on our landing page.</p>
-    </div>
-</body>
-</html>
-        """
-    )
+    _send_email(email, "TAPIERE - You're on the waitlist!", _CONFIRMATION_HTML)
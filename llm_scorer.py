@@ -3,12 +3,18 @@ LLM-based fit scoring using Alibaba DashScope with Qwen models.
 Analyzes item descriptions against user's sizing profile.
 """
 
+import asyncio
+import functools
+import hashlib
+import json
 import os
+import re
+import threading
 from typing import Optional
 
 # Try to import OpenAI client for DashScope compatibility
 try:
-    from openai import OpenAI
+    from openai import OpenAI, AsyncOpenAI
     HAS_OPENAI = True
 except ImportError:
     HAS_OPENAI = False
@@ -17,6 +23,18 @@ except ImportError:
 DASHSCOPE_API_KEY = os.getenv("DASHSCOPE_API_KEY", "")
 DASHSCOPE_BASE_URL = "https://dashscope-intl.aliyuncs.com/compatible-mode/v1"
 
+# One client for all scoring calls - constructing OpenAI() per call threw
+# away its internal connection pool and paid a TLS handshake every time
+_CLIENT = OpenAI(
+    api_key=DASHSCOPE_API_KEY,
+    base_url=DASHSCOPE_BASE_URL,
+) if HAS_OPENAI and DASHSCOPE_API_KEY else None
+
+_ACLIENT = AsyncOpenAI(
+    api_key=DASHSCOPE_API_KEY,
+    base_url=DASHSCOPE_BASE_URL,
+) if HAS_OPENAI and DASHSCOPE_API_KEY else None
+
 MEASUREMENT_LABELS = {
     'a': 'Shoulder width (肩幅)',
     'b': 'Chest width (身幅)',
@@ -34,20 +52,136 @@ OPERATOR_MEANINGS = {
     '~': 'approximately'
 }
 
+JP_LABELS = {
+    '肩幅': 'a',
+    '身幅': 'b',
+    '着丈': 'c',
+    'ウエスト': 'd',
+    'ヒップ': 'e',
+    '股上': 'f',
+    '股下': 'g',
+}
+
+
+def _local_fit_score(item_description: str, sizing_profile: dict) -> Optional[int]:
+    """Score from explicit measurements without the LLM, when possible.
+
+    Listings that state 身幅52 着丈68 etc. need arithmetic, not a model.
+    Returns None when the description and profile share no measurements,
+    in which case the caller falls back to Qwen.
+    """
+    measures = {}
+    for label, val in _MEASUREMENT_RE.findall((item_description or "")[:2000]):
+        key = JP_LABELS.get(label)
+        if key and key not in measures:
+            try:
+                measures[key] = float(val)
+            except ValueError:
+                pass
+    if not measures:
+        return None
+
+    compared = failed = near = 0
+    for key, measured in measures.items():
+        op = sizing_profile.get(f'size_{key}_op')
+        val = sizing_profile.get(f'size_{key}_val')
+        if not (op and val):
+            continue
+        target = float(val)
+        compared += 1
+        if op == '>':
+            if measured < target:
+                failed += 1
+        elif op == '<':
+            if measured > target:
+                failed += 1
+        elif op == '~':
+            diff = abs(measured - target)
+            if diff > 4:
+                failed += 1
+            elif diff > 2:
+                near += 1
+    if compared == 0:
+        return None
+
+    # Mirror the prompt's rubric: everything within 2cm is a great fit,
+    # within 4cm acceptable, majority misses a poor fit
+    if failed == 0:
+        return 3 if near else 4
+    return 1 if failed * 2 > compared else 2
+
+
+# Near-duplicate listings (same brand boilerplate, same numbers) score
+# identically, so cache scores by the extracted measurement signature and
+# skip the Qwen call for repeats. The measurements and size labels are
+# what the prompt actually scores on, so keying on them catches the
+# duplicates an embedding model would - without the model dependency.
+_MEASUREMENT_RE = re.compile(
+    r'(肩幅|身幅|着丈|ウエスト|ヒップ|股上|股下)\s*[:：]?\s*(\d{1,3}(?:\.\d)?)')
+_SIZE_LABEL_RE = re.compile(r'サイズ表記\s*[:：]?\s*(\S{1,4})|\b(XS|XXL|XL|S|M|L|FREE)\b')
+_SEMANTIC_CACHE_MAX = 10_000
+_semantic_cache = {}
+_cache_lock = threading.Lock()
+
+# At temperature 0 the scorer is deterministic, so an
+# identical (description, profile) pair can skip the API outright
+_EXACT_CACHE_MAX = 50_000
+_exact_cache = {}
+
+
+def _exact_key(description: str, sizing_profile: dict) -> str:
+    payload = json.dumps({"d": description[:2000], "p": _profile_key(sizing_profile)},
+                         sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def _profile_key(sizing_profile: dict) -> str:
+    sized = {k: str(sizing_profile[k]) for k in sorted(sizing_profile) if k.startswith('size_')}
+    return hashlib.blake2b(json.dumps(sized, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+def _measurement_signature(description: str) -> Optional[str]:
+    """Canonical measurement/size-label signature of a description."""
+    text = description[:2000]
+    measures = sorted(set(_MEASUREMENT_RE.findall(text)))
+    labels = sorted({a or b for a, b in _SIZE_LABEL_RE.findall(text)})
+    if not measures and not labels:
+        return None  # nothing to key on - don't risk cross-item collisions
+    return repr((measures, labels))
+
+
+# The (op_key, val_key, label) triples never change, and profiles repeat
+# across a whole batch - precompute the keys and cache the rendered text
+_PROFILE_KEYS = tuple(
+    (f'size_{k}_op', f'size_{k}_val', MEASUREMENT_LABELS[k]) for k in 'abcdefgh')
+
+
+@functools.lru_cache(maxsize=128)
+def _sizing_prompt_cached(profile_items: tuple) -> str:
+    profile = dict(profile_items)
+    preferences = [
+        f"- {label}: {OPERATOR_MEANINGS.get(op, '')} {val}cm"
+        for op_key, val_key, label in _PROFILE_KEYS
+        if (op := profile.get(op_key)) and (val := profile.get(val_key))
+    ]
+    return '\n'.join(preferences) if preferences else "No specific measurements specified"
+
 
 def build_sizing_prompt(sizing_profile: dict) -> str:
     """Convert sizing profile dict to natural language preferences."""
-    preferences = []
-    for key in ['a', 'b', 'c', 'd', 'e', 'f', 'g', 'h']:
-        op_key = f'size_{key}_op'
-        val_key = f'size_{key}_val'
-        op = sizing_profile.get(op_key)
-        val = sizing_profile.get(val_key)
-        if op and val:
-            label = MEASUREMENT_LABELS.get(key, key.upper())
-            meaning = OPERATOR_MEANINGS.get(op, '')
-            preferences.append(f"- {label}: {meaning} {val}cm")
-    return '\n'.join(preferences) if preferences else "No specific measurements specified"
+    return _sizing_prompt_cached(tuple(sorted(
+        (k, v) for k, v in sizing_profile.items() if k.startswith('size_') and v)))
+
+
+# Fixed instructions live in the system message: DashScope caches system
+# prefixes across calls, and the short rubric leaves only the profile and
+# description as per-call tokens
+_SYSTEM_PROMPT = """You are a clothing fit analyzer. Rate how well a Japanese clothing listing fits the user's measurement preferences.
+
+4 = great fit, 3 = acceptable (within 2-3cm), 2 = mediocre, 1 = poor fit.
+If the listing states no measurements, estimate from size labels (S/M/L, I=S II=M III=L, FREE). Answer 0 if truly unable to determine.
+
+Respond with ONLY one digit: 0, 1, 2, 3, or 4."""
 
 
 def score_item_fit(item_description: str, sizing_profile: dict) -> Optional[int]:
@@ -65,59 +199,146 @@ def score_item_fit(item_description: str, sizing_profile: dict) -> Optional[int]
         1 = Poor fit (measurements clearly don't match)
         None = Error or unable to determine
     """
-    if not HAS_OPENAI or not DASHSCOPE_API_KEY:
+    if _CLIENT is None:
         return None
 
+    hit, value, exact_key, cache_key, messages = _prepare_scoring(item_description, sizing_profile)
+    if hit:
+        return value
+
+    try:
+        completion = _CLIENT.chat.completions.create(
+            model="qwen-turbo",  # Fast and cheap
+            messages=messages,
+            max_tokens=1,  # The answer is one digit - force a single decode step
+            temperature=0,
+        )
+
+        return _finish_score(completion.choices[0].message.content.strip(),
+                             exact_key, cache_key)
+
+    except Exception as e:
+        print(f"[LLM Scorer] Error: {e}")
+        return None
+
+
+def _prepare_scoring(item_description: str, sizing_profile: dict):
+    """Shared prelude for the sync and async scorers.
+
+    Returns (hit, value, exact_key, cache_key, messages). When hit is True
+    the caller should return value without calling the API.
+    """
     sizing_text = build_sizing_prompt(sizing_profile)
     if sizing_text == "No specific measurements specified":
-        return None  # No sizing profile configured
+        return True, None, None, None, None  # No sizing profile configured
 
-    prompt = f"""You are a clothing fit analyzer. Given a user's body measurement preferences and a Japanese clothing item description, rate how well this item would fit.
+    exact_key = _exact_key(item_description or "", sizing_profile)
+    signature = _measurement_signature(item_description or "")
+    cache_key = (_profile_key(sizing_profile), signature) if signature else None
+    with _cache_lock:
+        if exact_key in _exact_cache:
+            return True, _exact_cache[exact_key], None, None, None
+        if cache_key and cache_key in _semantic_cache:
+            return True, _semantic_cache[cache_key], None, None, None
 
-User's measurement preferences:
-{sizing_text}
+    # Explicit measurements are plain arithmetic - skip the LLM entirely
+    local = _local_fit_score(item_description, sizing_profile)
+    if local is not None:
+        with _cache_lock:
+            _exact_cache[exact_key] = local
+            if cache_key:
+                _semantic_cache[cache_key] = local
+        return True, local, None, None, None
 
-Item description:
-{item_description[:2000]}
+    messages = [
+        {"role": "system", "content": _SYSTEM_PROMPT},
+        {"role": "user", "content": (
+            f"User preferences:\n{sizing_text}\n\n"
+            f"Item:\n{item_description[:1500]}")},
+    ]
+    return False, None, exact_key, cache_key, messages
 
-Rate the fit on this scale:
-4 = Great fit (measurements clearly match preferences)
-3 = Acceptable fit (measurements are close enough, within 2-3cm)
-2 = Mediocre fit (some measurements are notably off)
-1 = Poor fit (measurements clearly don't match preferences)
 
-If the description doesn't include relevant measurements (like 身幅, 着丈, 肩幅, etc.), make your best guess based on size labels (S/M/L, I/II/III, FREE SIZE) or respond with 0 if truly unable to determine.
+def _finish_score(score_text: str, exact_key, cache_key) -> Optional[int]:
+    """Parse the model response and fill both caches on a valid score."""
+    # Extract first digit from response
+    for char in score_text:
+        if char.isdigit():
+            score = int(char)
+            if not 1 <= score <= 4:
+                return None
+            with _cache_lock:
+                if len(_exact_cache) >= _EXACT_CACHE_MAX:
+                    _exact_cache.clear()
+                _exact_cache[exact_key] = score
+                if cache_key:
+                    if len(_semantic_cache) >= _SEMANTIC_CACHE_MAX:
+                        _semantic_cache.clear()
+                    _semantic_cache[cache_key] = score
+            return score
+    return None
 
-Important: Many Japanese listings use Roman numerals (I=S, II=M, III=L) or mention measurements in the description like "身幅52 着丈65".
 
-Respond with ONLY a single digit (0, 1, 2, 3, or 4). No explanation."""
+async def _score_one_async(item_description: str, sizing_profile: dict) -> Optional[int]:
+    """Async mirror of score_item_fit over the shared AsyncOpenAI client."""
+    hit, value, exact_key, cache_key, messages = _prepare_scoring(item_description, sizing_profile)
+    if hit:
+        return value
 
     try:
-        client = OpenAI(
-            api_key=DASHSCOPE_API_KEY,
-            base_url=DASHSCOPE_BASE_URL,
+        completion = await _ACLIENT.chat.completions.create(
+            model="qwen-turbo",
+            messages=messages,
+            max_tokens=1,
+            temperature=0,
         )
 
-        completion = client.chat.completions.create(
-            model="qwen-turbo",  # Fast and cheap
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=5,
-            temperature=0.1,
-        )
-
-        score_text = completion.choices[0].message.content.strip()
-        # Extract first digit from response
-        for char in score_text:
-            if char.isdigit():
-                score = int(char)
-                return score if 1 <= score <= 4 else None
-        return None
+        return _finish_score(completion.choices[0].message.content.strip(),
+                             exact_key, cache_key)
 
     except Exception as e:
         print(f"[LLM Scorer] Error: {e}")
         return None
 
 
+async def score_items_batch_async(pairs: list, concurrency: int = 8) -> list:
+    """Score (description, profile) pairs concurrently; the calls are
+    I/O-bound, so bounded fan-out cuts a serial batch to roughly
+    len(pairs) / concurrency round-trips.
+
+    Sellers reuse description boilerplate, so duplicates within a batch
+    are coalesced to one call each and the score scattered back - the
+    exact cache alone can't catch these because the calls are in flight
+    concurrently.
+    """
+    sem = asyncio.Semaphore(concurrency)
+
+    groups = {}
+    for i, (description, profile) in enumerate(pairs):
+        groups.setdefault(_exact_key(description or "", profile), []).append(i)
+
+    async def bounded(description, profile):
+        async with sem:
+            return await _score_one_async(description, profile)
+
+    index_groups = list(groups.values())
+    scores = await asyncio.gather(
+        *(bounded(*pairs[idxs[0]]) for idxs in index_groups))
+
+    results = [None] * len(pairs)
+    for score, idxs in zip(scores, index_groups):
+        for i in idxs:
+            results[i] = score
+    return results
+
+
+def score_items_batch(pairs: list, concurrency: int = 8) -> list:
+    """Sync wrapper: score a batch of (description, profile) pairs."""
+    if _ACLIENT is None:
+        return [None] * len(pairs)
+    return asyncio.run(score_items_batch_async(pairs, concurrency))
+
+
 def score_item_fit_sync(item_description: str, sizing_profile: dict) -> Optional[int]:
     """Synchronous wrapper for score_item_fit."""
     return score_item_fit(item_description, sizing_profile)
@@ -3,12 +3,28 @@ Mercari API utilities - local implementation to avoid cffi dependency issues.
 Uses PyJWT with cryptography for DPOP generation.
 """
 
+import asyncio
 import base64
 import json
+import random
+import threading
 import uuid as uuid_lib
-from time import time
+from concurrent.futures import ThreadPoolExecutor
+from time import time, sleep
 import httpx
 
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, separators=(',', ':'))
+
 # Try cryptography first (needs cffi), fallback to pure-python ecdsa
 try:
     from cryptography.hazmat.primitives import hashes
@@ -19,17 +35,16 @@ except ImportError:
         import ecdsa
         import hashlib
         CRYPTO_BACKEND = "ecdsa"
+        print("[MercariAPI] WARNING: using pure-python ecdsa fallback - "
+              "signing is ~50x slower than cryptography; install cryptography")
     except ImportError:
         CRYPTO_BACKEND = None
         print("[MercariAPI] No crypto backend available - Mercari API calls will fail")
 
 
-def int_to_bytes(n):
-    return n.to_bytes((n.bit_length() + 7) // 8, byteorder='big')
-
-
 def int_to_base64url(n):
-    return bytes_to_base64url(int_to_bytes(n))
+    # P-256 coordinates are fixed 32-byte big-endian values
+    return bytes_to_base64url(n.to_bytes(32, byteorder='big'))
 
 
 def str_to_base64url(s):
@@ -37,7 +52,47 @@ def str_to_base64url(s):
 
 
 def bytes_to_base64url(b):
-    return base64.urlsafe_b64encode(b).decode('utf-8').rstrip('=')
+    # rstrip the padding while still bytes - one C-level tail scan, then
+    # decode the already-trimmed buffer
+    return base64.urlsafe_b64encode(b).rstrip(b'=').decode('ascii')
+
+
+# Keypair generation dominates DPOP cost, and Mercari only checks that
+# the token is signed by the key in its own header - so one keypair
+# (rotated hourly) serves every request, leaving just a signature per call
+_DPOP_KEY_TTL = 3600
+_dpop_key_lock = threading.Lock()
+_dpop_key = {"private_key": None, "header_b64": None, "created_at": 0.0}
+
+
+def _get_dpop_key():
+    """Return (private_key, pre-encoded header) for the active backend."""
+    with _dpop_key_lock:
+        if _dpop_key["private_key"] is None or time() - _dpop_key["created_at"] > _DPOP_KEY_TTL:
+            if CRYPTO_BACKEND == "cryptography":
+                private_key = ec.generate_private_key(ec.SECP256R1())
+                public_numbers = private_key.public_key().public_numbers()
+                x, y = public_numbers.x, public_numbers.y
+            else:
+                import ecdsa
+                private_key = ecdsa.SigningKey.generate(curve=ecdsa.NIST256p)
+                point = private_key.get_verifying_key().pubkey.point
+                x, y = point.x(), point.y()
+
+            header = {
+                "typ": "dpop+jwt",
+                "alg": "ES256",
+                "jwk": {
+                    "crv": "P-256",
+                    "kty": "EC",
+                    "x": int_to_base64url(x),
+                    "y": int_to_base64url(y),
+                }
+            }
+            _dpop_key["private_key"] = private_key
+            _dpop_key["header_b64"] = str_to_base64url(_json_dumps(header))
+            _dpop_key["created_at"] = time()
+        return _dpop_key["private_key"], _dpop_key["header_b64"]
 
 
 def generate_dpop(*, uuid, method, url):
@@ -50,31 +105,21 @@ def generate_dpop(*, uuid, method, url):
         raise ImportError("No crypto backend available for DPOP generation")
 
 
-def _generate_dpop_cryptography(*, uuid, method, url):
-    """Generate DPOP using cryptography library."""
-    private_key = ec.generate_private_key(ec.SECP256R1())
-    public_key = private_key.public_key()
-    public_numbers = public_key.public_numbers()
-
-    header = {
-        "typ": "dpop+jwt",
-        "alg": "ES256",
-        "jwk": {
-            "crv": "P-256",
-            "kty": "EC",
-            "x": int_to_base64url(public_numbers.x),
-            "y": int_to_base64url(public_numbers.y),
-        }
-    }
-
+def _dpop_payload_b64(uuid, method, url):
     payload = {
         "iat": int(time()),
         "jti": uuid,
         "htu": url,
         "htm": method.upper(),
     }
+    return str_to_base64url(_json_dumps(payload))
+
+
+def _generate_dpop_cryptography(*, uuid, method, url):
+    """Generate DPOP using cryptography library."""
+    private_key, header_b64 = _get_dpop_key()
 
-    data_to_sign = f"{str_to_base64url(json.dumps(header))}.{str_to_base64url(json.dumps(payload))}"
+    data_to_sign = f"{header_b64}.{_dpop_payload_b64(uuid, method, url)}"
 
     signature = private_key.sign(
         data_to_sign.encode('utf-8'),
@@ -92,38 +137,15 @@ def _generate_dpop_cryptography(*, uuid, method, url):
 
 def _generate_dpop_ecdsa(*, uuid, method, url):
     """Generate DPOP using pure-python ecdsa library."""
-    import ecdsa
     import hashlib
 
-    private_key = ecdsa.SigningKey.generate(curve=ecdsa.NIST256p)
-    public_key = private_key.get_verifying_key()
-
-    # Get x, y coordinates
-    point = public_key.pubkey.point
-    x = point.x()
-    y = point.y()
-
-    header = {
-        "typ": "dpop+jwt",
-        "alg": "ES256",
-        "jwk": {
-            "crv": "P-256",
-            "kty": "EC",
-            "x": int_to_base64url(x),
-            "y": int_to_base64url(y),
-        }
-    }
+    private_key, header_b64 = _get_dpop_key()
 
-    payload = {
-        "iat": int(time()),
-        "jti": uuid,
-        "htu": url,
-        "htm": method.upper(),
-    }
-
-    data_to_sign = f"{str_to_base64url(json.dumps(header))}.{str_to_base64url(json.dumps(payload))}"
+    data_to_sign = f"{header_b64}.{_dpop_payload_b64(uuid, method, url)}"
 
-    signature = private_key.sign(
+    # Deterministic (RFC 6979) signing skips the per-call RNG draw - the
+    # slow pure-python path needs every saving it can get
+    signature = private_key.sign_deterministic(
         data_to_sign.encode('utf-8'),
         hashfunc=hashlib.sha256
     )
@@ -147,7 +169,15 @@ class MercariItemStatus:
 
 
 class MercariItem:
-    """Represents a Mercari item."""
+    """Represents a Mercari item.
+
+    Slotted, and deliberately does not retain the raw API dict - a search
+    yields hundreds of these and the nested JSON the callers never touch
+    would otherwise dominate their resident size.
+    """
+    __slots__ = ('id', 'name', 'price', 'status', 'description',
+                 'photos', 'thumbnails', 'created', 'updated')
+
     def __init__(self, data):
         self.id = data.get('id')
         self.name = data.get('name')
@@ -158,7 +188,6 @@ class MercariItem:
         self.thumbnails = data.get('thumbnails', [])
         self.created = data.get('created')
         self.updated = data.get('updated')
-        self._data = data
 
     @property
     def image_url(self):
@@ -169,30 +198,130 @@ class MercariItem:
         return None
 
 
-def _make_request(url, data, method="GET"):
-    """Make authenticated request to Mercari API."""
-    dpop = generate_dpop(
-        uuid="MercariBot",
-        method=method,
-        url=url,
-    )
+# One keep-alive client for all API calls - search pagination and item
+# fetches hit the same host, so each reused connection saves a TCP+TLS
+# handshake that module-level httpx.get paid on every request
+_client = None
 
-    headers = {
-        'DPOP': dpop,
-        'X-Platform': 'web',
-        'Accept': '*/*',
-        'Accept-Encoding': 'deflate, gzip',
-        'Content-Type': 'application/json; charset=utf-8',
-        'User-Agent': 'python-mercari',
-    }
 
-    if method == "GET":
-        response = httpx.get(url, headers=headers, params=data, timeout=15)
-    else:
-        response = httpx.post(url, headers=headers, json=data, timeout=15)
+def _get_client():
+    global _client
+    if _client is None:
+        import atexit
+        _client = httpx.Client(
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+            timeout=15.0,
+            headers={
+                'X-Platform': 'web',
+                'Accept': '*/*',
+                'Content-Type': 'application/json; charset=utf-8',
+                'User-Agent': 'python-mercari',
+            },
+        )
+        atexit.register(_client.close)
+    return _client
+
+
+# Transient 5xx/timeouts used to abort a crawl mid-pagination; retry
+# them with capped exponential backoff + jitter. The token bucket spaces
+# request starts client-side so bursts don't trip Mercari throttling.
+_RETRY_ATTEMPTS = 4
+_RETRY_BASE = 0.5
+_RETRY_MAX = 8.0
+
+
+class _TokenBucket:
+    """Refills `rate` tokens/sec up to `capacity`; consume() blocks."""
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time()
+        self.lock = threading.Lock()
+
+    def consume(self, n=1):
+        while True:
+            with self.lock:
+                now = time()
+                self.tokens = min(self.capacity,
+                                  self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= n:
+                    self.tokens -= n
+                    return
+                wait = (n - self.tokens) / self.rate
+            sleep(wait)
+
+
+_BUCKET = _TokenBucket(rate=5, capacity=10)
 
-    response.raise_for_status()
-    return response.json()
+
+def _retryable(exc):
+    """Retry timeouts/transport errors and 5xx/429; fail fast on other 4xx."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        status = exc.response.status_code
+        return status >= 500 or status == 429
+    return isinstance(exc, httpx.TransportError)
+
+
+def _retry_delay(attempt):
+    return min(_RETRY_MAX, _RETRY_BASE * 2 ** attempt) * (0.5 + random.random() / 2)
+
+
+def _make_request(url, data, method="GET"):
+    """Make authenticated request to Mercari API, retrying transient errors."""
+    client = _get_client()
+    for attempt in range(_RETRY_ATTEMPTS):
+        _BUCKET.consume()
+        dpop = generate_dpop(
+            uuid="MercariBot",
+            method=method,
+            url=url,
+        )
+        try:
+            if method == "GET":
+                response = client.get(url, headers={'DPOP': dpop}, params=data)
+            else:
+                response = client.post(url, headers={'DPOP': dpop},
+                                       content=_json_dumps(data))
+            response.raise_for_status()
+            return _json_loads(response.content)
+        except (httpx.HTTPStatusError, httpx.TransportError) as e:
+            if not _retryable(e) or attempt == _RETRY_ATTEMPTS - 1:
+                raise
+            delay = _retry_delay(attempt)
+            print(f"[MercariAPI] Retrying after {type(e).__name__} ({delay:.1f}s)")
+            sleep(delay)
+
+
+# Items get re-queried within minutes (re-scoring, refreshed views); a
+# short TTL cache on the raw payload skips the DPOP + network round-trip
+# while staying fresh enough for prices
+_ITEM_CACHE_TTL = 300
+_ITEM_CACHE_MAX = 10_000
+_item_cache = {}
+_item_cache_lock = threading.Lock()
+
+
+def clear_item_cache():
+    with _item_cache_lock:
+        _item_cache.clear()
+
+
+def _item_cache_get(key):
+    with _item_cache_lock:
+        hit = _item_cache.get(key)
+        if hit and time() - hit[1] < _ITEM_CACHE_TTL:
+            return hit[0]
+    return None
+
+
+def _item_cache_put(key, data):
+    with _item_cache_lock:
+        if len(_item_cache) >= _ITEM_CACHE_MAX:
+            _item_cache.clear()
+        _item_cache[key] = (data, time())
 
 
 def get_item_info(item_id, country_code=None):
@@ -206,6 +335,11 @@ def get_item_info(item_id, country_code=None):
     Returns:
         MercariItem object
     """
+    key = (item_id, country_code or '')
+    cached = _item_cache_get(key)
+    if cached is not None:
+        return MercariItem(cached)
+
     data = {
         "id": item_id,
         "include_item_attributes": True,
@@ -217,7 +351,9 @@ def get_item_info(item_id, country_code=None):
         data["country_code"] = country_code
 
     result = _make_request(ITEM_INFO_URL, data, method="GET")
-    return MercariItem(result.get('data', {}))
+    item_data = result.get('data', {})
+    _item_cache_put(key, item_data)
+    return MercariItem(item_data)
 
 
 def search(keywords, limit=120, status="STATUS_ON_SALE"):
@@ -232,7 +368,32 @@ def search(keywords, limit=120, status="STATUS_ON_SALE"):
     Yields:
         MercariItem objects
     """
-    data = {
+    data = _search_payload(keywords, limit, status)
+
+    # Prefetch page K+1 while the caller consumes page K, hiding the
+    # per-page round-trip behind downstream processing time
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        future = executor.submit(_make_request, SEARCH_URL, data, "POST")
+        while future is not None:
+            result = future.result()
+            items = result.get("items", [])
+
+            if not items:
+                break
+
+            next_token = result.get("meta", {}).get("nextPageToken")
+            if next_token:
+                data = dict(data, pageToken=next_token)
+                future = executor.submit(_make_request, SEARCH_URL, data, "POST")
+            else:
+                future = None
+
+            for item_data in items:
+                yield MercariItem(item_data)
+
+
+def _search_payload(keywords, limit, status):
+    return {
         "userId": f"BOT_{uuid_lib.uuid4()}",
         "pageSize": limit,
         "pageToken": "v1:0",
@@ -248,9 +409,76 @@ def search(keywords, limit=120, status="STATUS_ON_SALE"):
         "defaultDatasets": ["DATASET_TYPE_MERCARI", "DATASET_TYPE_BEYOND"]
     }
 
+
+async def _amake_request(url, data, client, method="GET"):
+    """Async mirror of _make_request over a shared AsyncClient.
+
+    Same retry policy; pacing comes from the caller's semaphore rather
+    than the blocking token bucket.
+    """
+    for attempt in range(_RETRY_ATTEMPTS):
+        dpop = generate_dpop(
+            uuid="MercariBot",
+            method=method,
+            url=url,
+        )
+        try:
+            if method == "GET":
+                response = await client.get(url, headers={'DPOP': dpop}, params=data)
+            else:
+                response = await client.post(url, headers={'DPOP': dpop},
+                                             content=_json_dumps(data))
+            response.raise_for_status()
+            return _json_loads(response.content)
+        except (httpx.HTTPStatusError, httpx.TransportError) as e:
+            if not _retryable(e) or attempt == _RETRY_ATTEMPTS - 1:
+                raise
+            delay = _retry_delay(attempt)
+            print(f"[MercariAPI] Retrying after {type(e).__name__} ({delay:.1f}s)")
+            await asyncio.sleep(delay)
+
+
+def _make_aclient():
+    return httpx.AsyncClient(
+        limits=httpx.Limits(max_keepalive_connections=32, max_connections=32),
+        timeout=15.0,
+        headers={
+            'X-Platform': 'web',
+            'Accept': '*/*',
+            'Content-Type': 'application/json; charset=utf-8',
+            'User-Agent': 'python-mercari',
+        },
+    )
+
+
+async def aget_item_info(item_id, client, country_code=None):
+    """Async variant of get_item_info using a shared client."""
+    key = (item_id, country_code or '')
+    cached = _item_cache_get(key)
+    if cached is not None:
+        return MercariItem(cached)
+
+    data = {
+        "id": item_id,
+        "include_item_attributes": True,
+        "include_auction": True,
+    }
+    if country_code:
+        data["country_code"] = country_code
+
+    result = await _amake_request(ITEM_INFO_URL, data, client, method="GET")
+    item_data = result.get('data', {})
+    _item_cache_put(key, item_data)
+    return MercariItem(item_data)
+
+
+async def asearch(keywords, client, limit=120, status="STATUS_ON_SALE"):
+    """Async variant of search - an async generator over result pages."""
+    data = _search_payload(keywords, limit, status)
+
     has_next_page = True
     while has_next_page:
-        result = _make_request(SEARCH_URL, data, method="POST")
+        result = await _amake_request(SEARCH_URL, data, client, method="POST")
         items = result.get("items", [])
 
         if not items:
@@ -264,3 +492,24 @@ def search(keywords, limit=120, status="STATUS_ON_SALE"):
             data["pageToken"] = next_token
         else:
             has_next_page = False
+
+
+async def aget_items(item_ids, concurrency=16, country_code=None):
+    """Fetch many items concurrently; returns MercariItem or None per id."""
+    sem = asyncio.Semaphore(concurrency)
+
+    async def fetch_one(item_id, client):
+        async with sem:
+            try:
+                return await aget_item_info(item_id, client, country_code)
+            except Exception as e:
+                print(f"[MercariAPI] Error fetching {item_id}: {e}")
+                return None
+
+    async with _make_aclient() as client:
+        return await asyncio.gather(*(fetch_one(item_id, client) for item_id in item_ids))
+
+
+def get_items(item_ids, concurrency=16, country_code=None):
+    """Sync wrapper: fetch many items in parallel instead of one RTT each."""
+    return asyncio.run(aget_items(item_ids, concurrency, country_code))
@@ -4,172 +4,388 @@ Uses direct HTTP for Yahoo (fast) and Playwright for Mercari (JS-rendered).
 Smart scraping: stops when we find 5 consecutive items that already exist.
 """
 
-import time
 import re
+import sys
+import json
 import random
 import asyncio
 from urllib.parse import quote
-from tqdm import tqdm
 
-from database import save_scraped_items, update_keyword_scraped, get_keywords, get_existing_source_ids
+# libuv-backed event loop: same asyncio API, noticeably cheaper socket
+# scheduling once all keywords and pages run concurrently. Optional,
+# like the other native accelerators here.
+if sys.platform != 'win32':
+    try:
+        import uvloop
+        uvloop.install()
+    except ImportError:
+        pass
+
+from database import save_scraped_items, update_keyword_scraped, get_keywords, get_existing_id_filter
+from yahoo_parse import parse_yahoo_page
+
+# orjson decodes the 100+ KB Mercari responses several times faster than
+# the stdlib codec - same optional split as detail_scraper
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+
+    def _json_dumps(obj) -> str:
+        return json.dumps(obj, separators=(',', ':'))
 
 # Number of consecutive existing items to trigger stop
 OVERLAP_THRESHOLD = 5
 
+# Per-item patterns compiled once - re.search's internal cache still pays
+# a dict lookup per call, which adds up over hundreds of items per page
+_MERCARI_ITEM_RE = re.compile(r'^m\d{11}$')
+_RAKUTEN_ID_RE = re.compile(r'/([a-f0-9]{32})')
+_PRICE_RE = re.compile(r'[\d,]+')
+_STRIP_COMMA = str.maketrans('', '', ',')
+
+_YAHOO_ITEM_URL = "https://page.auctions.yahoo.co.jp/jp/auction/"
+_MERCARI_ITEM_URL = "https://jp.mercari.com/item/"
+_MERCARI_SHOP_URL = "https://jp.mercari.com/shops/product/"
+_FRIL_ITEM_URL = "https://item.fril.jp/"
+
+
+def _cap(s: str, n: int = 200) -> str:
+    # Slicing always allocates; most titles are short, so skip it
+    return s if len(s) <= n else s[:n]
+
+
+class _OverlapScan:
+    """Shared dedupe/overlap-stop pass for the scrape loops.
+
+    Tracks the consecutive-already-known counter across pages and
+    filters one page's (id, raw) pairs down to the genuinely new raws.
+    The identical logic used to be copied into each scraper's loop.
+    """
+
+    __slots__ = ('existing', 'seen', 'consecutive', 'stopped')
+
+    def __init__(self, existing_ids):
+        self.existing = existing_ids
+        self.seen = set()
+        self.consecutive = 0
+        self.stopped = False
+
+    def filter_page(self, pairs, budget: int = None) -> list:
+        existing = self.existing
+        seen = self.seen
+        consecutive = self.consecutive
+        kept = []
+        for iid, raw in pairs:
+            if budget is not None and len(kept) >= budget:
+                break
+            # Skip duplicates in current batch
+            if iid in seen:
+                continue
+            # Check against existing items
+            if iid in existing:
+                consecutive += 1
+                if consecutive >= OVERLAP_THRESHOLD:
+                    self.stopped = True
+                    break
+                continue
+            consecutive = 0
+            seen.add(iid)
+            kept.append(raw)
+        self.consecutive = consecutive
+        return kept
+
+
+def _flush_page(save_tasks: list, page_items: list, keyword_id: int):
+    """Queue a page's items for a background DB write.
+
+    Saving page-by-page keeps progress if a later page fails and lets
+    the SQLite commit/fsync overlap the next page's network fetch.
+    INSERT OR IGNORE in save_scraped_items keeps replays harmless.
+    """
+    if save_tasks is not None and page_items and keyword_id:
+        save_tasks.append(asyncio.create_task(
+            asyncio.to_thread(save_scraped_items, page_items, keyword_id)))
+
+
+def _rakuten_price(entry: dict) -> int:
+    """Price from the data-content attribute, falling back to text."""
+    price = int(entry["price_content"]) if entry["price_content"].isdigit() else 0
+    if price == 0 and entry["price_text"]:
+        price_match = _PRICE_RE.search(entry["price_text"])
+        if price_match:
+            price = int(price_match.group().translate(_STRIP_COMMA))
+    return price
+
+# Only advertise brotli when we can actually decode it - httpx would
+# otherwise hand back undecodable bodies. Search pages compress ~2x
+# better under br than gzip, so it's worth requesting when available.
+try:
+    import brotli  # noqa: F401
+    _ACCEPT_ENCODING = "br, gzip, deflate"
+except ImportError:
+    _ACCEPT_ENCODING = "gzip, deflate"
+
+_BROWSER_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept-Language": "ja-JP,ja;q=0.9",
+    "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+    "Accept-Encoding": _ACCEPT_ENCODING,
+}
+
+# One keep-alive client shared by the HTML scrapers - a fresh AsyncClient
+# per call paid a TCP+TLS handshake for every keyword's first page.
+# Sockets are loop-bound, so the client is cached per running event loop
+# and rebuilt when a new asyncio.run starts.
+_async_client = None
+_client_loop = None
+
+
+def _get_async_client():
+    global _async_client, _client_loop
+    import httpx
+    loop = asyncio.get_running_loop()
+    if _async_client is None or _client_loop is not loop:
+        _async_client = httpx.AsyncClient(
+            headers=_BROWSER_HEADERS,
+            follow_redirects=True,
+            timeout=30.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=20),
+        )
+        _client_loop = loop
+    return _async_client
+
+
+async def close_clients():
+    """Close the shared scrape client (call from the loop that owns it)."""
+    global _async_client, _client_loop
+    if _async_client is not None and _client_loop is asyncio.get_running_loop():
+        await _async_client.aclose()
+        _async_client = None
+        _client_loop = None
+
+
+# ============== PAGE PARSERS ==============
+# selectolax (C HTML parser, ~20x faster than html.parser) when installed,
+# falling back to BeautifulSoup otherwise - same split as detail_scraper.
+# Both paths return plain dicts so the scrape loops stay parser-agnostic.
+# The Yahoo parser lives in yahoo_parse.py, which can be compiled to a
+# C extension for the attribute-heavy hot path.
+
+def _parse_rakuten_items(html: str) -> list:
+    """Normalized field dicts for each item-box on a Fril results page."""
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        return _parse_rakuten_items_soup(html)
+
+    tree = HTMLParser(html)
+    entries = []
+    for box in tree.css('div.item-box'):
+        link = box.css_first('a.link_search_image') or box.css_first('a.link_search_title')
+        title_link = box.css_first('a.link_search_title')
+        price_elem = box.css_first('p.item-box__item-price span[data-content]')
+        price_text_elem = box.css_first('p.item-box__item-price')
+        img_elem = box.css_first('img.img-responsive') or box.css_first('img.lazy')
+        img_attrs = img_elem.attributes if img_elem else {}
+        entries.append({
+            'href': link.attributes.get('href', '') if link else '',
+            'title': (title_link.attributes.get('title') or '') if title_link else '',
+            'price_content': (price_elem.attributes.get('data-content') or '') if price_elem else '',
+            'price_text': price_text_elem.text(strip=True) if price_text_elem else '',
+            'image_url': img_attrs.get('data-original') or img_attrs.get('src') or '',
+        })
+    return entries
+
+
+# Compiled soupsieve selectors for the bs4 fallback, built once on
+# first use - soup.select() re-tokenizes its selector string (modulo a
+# cache lookup) on every call, per box, per page. selectolax has no
+# separate compile step, so only the bs4 path needs this.
+_rakuten_soup_sel = None
+
+
+def _rakuten_soup_selectors():
+    global _rakuten_soup_sel
+    if _rakuten_soup_sel is None:
+        import soupsieve
+        _rakuten_soup_sel = (
+            soupsieve.compile('div.item-box'),
+            soupsieve.compile('a.link_search_image, a.link_search_title'),
+            soupsieve.compile('a.link_search_title'),
+            soupsieve.compile('p.item-box__item-price span[data-content]'),
+            soupsieve.compile('p.item-box__item-price'),
+            soupsieve.compile('img.img-responsive, img.lazy'),
+        )
+    return _rakuten_soup_sel
+
+
+def _first(sel, node):
+    matched = sel.select(node, limit=1)
+    return matched[0] if matched else None
+
+
+def _parse_rakuten_items_soup(html: str) -> list:
+    """BeautifulSoup fallback for environments without selectolax."""
+    from bs4 import BeautifulSoup
+
+    box_sel, link_sel, title_sel, price_sel, price_text_sel, img_sel = _rakuten_soup_selectors()
+    soup = BeautifulSoup(html, 'html.parser')
+    entries = []
+    for box in box_sel.select(soup):
+        link = _first(link_sel, box)
+        title_link = _first(title_sel, box)
+        price_elem = _first(price_sel, box)
+        price_text_elem = _first(price_text_sel, box)
+        img_elem = _first(img_sel, box)
+        entries.append({
+            'href': link.get('href', '') if link else '',
+            'title': (title_link.get('title') or '') if title_link else '',
+            'price_content': (price_elem.get('data-content') or '') if price_elem else '',
+            'price_text': price_text_elem.get_text(strip=True) if price_text_elem else '',
+            'image_url': (img_elem.get('data-original') or img_elem.get('src') or '') if img_elem else '',
+        })
+    return entries
+
 
 # ============== FAST HTTP SCRAPER FOR YAHOO ==============
 
 async def scrape_yahoo_fast(keyword: str, max_items: int = 300,
-                            existing_ids: set = None, keyword_id: int = None) -> list:
+                            existing_ids: set = None, keyword_id: int = None,
+                            sem: asyncio.Semaphore = None, save_tasks: list = None) -> list:
     """
     Fast Yahoo Auctions scraper using direct HTTP requests.
     Parses data-* attributes from HTML - no browser needed.
     """
     try:
-        import httpx
-        from bs4 import BeautifulSoup
+        import httpx  # noqa: F401 - the shared client below needs it
+        try:
+            import selectolax  # noqa: F401
+        except ImportError:
+            import bs4  # noqa: F401
     except ImportError:
         print("Missing dependencies. Run: pip install httpx beautifulsoup4")
         return []
 
     if existing_ids is None:
-        existing_ids = get_existing_source_ids('yahoo', keyword_id)
+        existing_ids = get_existing_id_filter('yahoo', keyword_id)
 
     all_items = []
-    consecutive_existing = 0
+    scan = _OverlapScan(existing_ids)
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept-Language": "ja-JP,ja;q=0.9",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    }
+    client = _get_async_client()
+    items_per_page = 100
+    max_pages = (max_items // items_per_page) + 2
 
-    async with httpx.AsyncClient(headers=headers, follow_redirects=True, timeout=30.0) as client:
-        page_num = 1
-        items_per_page = 100
-        max_pages = (max_items // items_per_page) + 2
+    def build_url(page):
+        # Calculate offset: b=1 for page 1, b=101 for page 2, etc.
+        offset = (page - 1) * items_per_page + 1
+        return f"https://auctions.yahoo.co.jp/search/search?p={quote(keyword)}&va={quote(keyword)}&exflg=1&b={offset}&n={items_per_page}&s1=new&o1=d"
 
-        while len(all_items) < max_items and page_num <= max_pages:
-            # Calculate offset: b=1 for page 1, b=101 for page 2, etc.
-            offset = (page_num - 1) * items_per_page + 1
-            search_url = f"https://auctions.yahoo.co.jp/search/search?p={quote(keyword)}&va={quote(keyword)}&exflg=1&b={offset}&n={items_per_page}&s1=new&o1=d"
+    print(f"[Yahoo-Fast] Searching: {build_url(1)}")
 
-            if page_num == 1:
-                print(f"[Yahoo-Fast] Searching: {search_url}")
+    # Pages don't depend on each other (the overlap stop is advisory),
+    # so fetch them all concurrently - bounded to 4 in flight - and
+    # merge in page order. Early-stop breaks the merge loop; unfinished
+    # fetches are cancelled in the finally below. A caller-provided
+    # semaphore bounds the host across keywords instead of per keyword.
+    if sem is None:
+        sem = asyncio.Semaphore(4)
 
+    async def fetch(page):
+        async with sem:
+            return await client.get(build_url(page))
+
+    page_tasks = [asyncio.ensure_future(fetch(p)) for p in range(1, max_pages + 1)]
+    try:
+        for page_num, task in enumerate(page_tasks, start=1):
+            if len(all_items) >= max_items:
+                break
             try:
-                response = await client.get(search_url)
+                response = await task
                 response.raise_for_status()
             except Exception as e:
                 print(f"[Yahoo-Fast] Request failed: {e}")
                 break
 
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Find all product links with data attributes
-            products = soup.select('a.Product__imageLink[data-auction-id]')
-
-            if not products:
-                # Try alternative selector
-                products = soup.select('[data-auction-id]')
+            products = parse_yahoo_page(response.text)
 
             if not products:
                 print(f"[Yahoo-Fast] No products found on page {page_num}")
                 break
 
-            page_new_items = 0
-            for product in products:
-                if len(all_items) >= max_items:
-                    break
-
-                auction_id = product.get('data-auction-id')
-                if not auction_id:
-                    continue
-
-                # Skip duplicates in current batch
-                if any(i["source_id"] == auction_id for i in all_items):
-                    continue
-
-                # Check against existing items
-                if auction_id in existing_ids:
-                    consecutive_existing += 1
-                    if consecutive_existing >= OVERLAP_THRESHOLD:
-                        print(f"[Yahoo-Fast] Found {OVERLAP_THRESHOLD} consecutive existing items, stopping")
-                        return all_items
-                    continue
-                else:
-                    consecutive_existing = 0
-
-                title = product.get('data-auction-title', f'Auction {auction_id}')
-                image_url = product.get('data-auction-img')
-                price_str = product.get('data-auction-price', '')
-
-                try:
-                    price = int(price_str) if price_str else None
-                except ValueError:
-                    price = None
-
-                # Extract category from data-auction-category attribute
-                category = product.get('data-auction-category')
-                category_id = f"yahoo:{category}" if category else None
-
-                all_items.append({
-                    "source": "yahoo",
-                    "source_id": auction_id,
-                    "url": f"https://page.auctions.yahoo.co.jp/jp/auction/{auction_id}",
-                    "title": title[:200],
-                    "price": price,
-                    "image_url": image_url,
-                    "category_id": category_id,
-                })
-                page_new_items += 1
-
-            if page_new_items == 0:
+            # Prefilter (dedupe/overlap bookkeeping), then build the dicts
+            # in one comprehension - cheaper than per-item .append of a
+            # seven-key literal in the hot loop
+            candidates = scan.filter_page(((p[0], p) for p in products),
+                                          max_items - len(all_items))
+
+            page_items = [{
+                "source": "yahoo",
+                "source_id": aid,
+                "url": _YAHOO_ITEM_URL + aid,
+                "title": _cap(title),
+                "price": price,
+                "image_url": img,
+                "category_id": f"yahoo:{cat}" if cat else None,
+            } for aid, title, img, price, cat in candidates]
+            all_items.extend(page_items)
+            _flush_page(save_tasks, page_items, keyword_id)
+
+            if scan.stopped:
+                print(f"[Yahoo-Fast] Found {OVERLAP_THRESHOLD} consecutive existing items, stopping")
+                return all_items
+            if not candidates:
                 # No new items on this page, stop
                 break
 
-            page_num += 1
+    finally:
+        for task in page_tasks:
+            task.cancel()
 
     print(f"[Yahoo-Fast] Scraped {len(all_items)} new items")
     return all_items
 
 
 async def scrape_mercari_fast(keyword: str, max_items: int = 300,
-                              existing_ids: set = None, keyword_id: int = None) -> list:
+                              existing_ids: set = None, keyword_id: int = None,
+                              sem: asyncio.Semaphore = None, save_tasks: list = None) -> list:
     """
     Fast Mercari scraper using the Mercari API directly.
     No browser needed - uses API calls with DPOP authentication.
     Returns JPY prices without localization issues.
     """
     try:
-        import requests
+        import httpx  # noqa: F401 - the shared client below needs it
         from mercari_api import generate_dpop
     except ImportError:
-        print("Missing mercari package. Run: pip install mercari")
+        print("Missing dependencies. Run: pip install httpx mercari")
         return []
 
     if existing_ids is None:
-        existing_ids = get_existing_source_ids('mercari', keyword_id)
+        existing_ids = get_existing_id_filter('mercari', keyword_id)
 
     all_items = []
-    consecutive_existing = 0
+    scan = _OverlapScan(existing_ids)
 
     search_url = "https://api.mercari.jp/v2/entities:search"
-    root_product_url = "https://jp.mercari.com/item/"
 
     print(f"[Mercari-API] Searching: {keyword}")
 
-    page_token = "v1:0"
-    has_next_page = True
-
-    while has_next_page and len(all_items) < max_items:
+    async def fetch_page(page_token):
+        # Async on the shared pool: a blocking requests.post here froze
+        # the event loop and serialized Mercari with the other sources
         dpop = generate_dpop(uuid="Mercari Python Bot", method="POST", url=search_url)
 
         headers = {
             'DPOP': dpop,
             'X-Platform': 'web',
             'Accept': '*/*',
-            'Accept-Encoding': 'deflate, gzip',
+            'Accept-Encoding': _ACCEPT_ENCODING,
             'Content-Type': 'application/json; charset=utf-8',
             'User-Agent': 'python-mercari',
         }
@@ -190,213 +406,194 @@ async def scrape_mercari_fast(keyword: str, max_items: int = 300,
             "defaultDatasets": ["DATASET_TYPE_MERCARI", "DATASET_TYPE_BEYOND"]
         }
 
-        try:
-            r = requests.post(search_url, headers=headers, json=data, timeout=30)
-            r.raise_for_status()
-            resp = r.json()
-        except Exception as e:
-            print(f"[Mercari-API] Request failed: {e}")
-            break
-
-        items = resp.get("items", [])
-        if not items:
-            break
-
-        next_page_token = resp.get("meta", {}).get("nextPageToken")
-        has_next_page = bool(next_page_token)
-        page_token = next_page_token
-
-        for item_data in items:
-            if len(all_items) >= max_items:
+        body = _json_dumps(data)
+        if sem is not None:
+            async with sem:
+                r = await _get_async_client().post(search_url, headers=headers, content=body)
+        else:
+            r = await _get_async_client().post(search_url, headers=headers, content=body)
+        r.raise_for_status()
+        return _json_loads(r.content)
+
+    # The next token only arrives with the current response, so pipeline
+    # depth is 1: submit page N+1 as soon as the token is known, then
+    # parse page N while it's in flight
+    next_task = asyncio.ensure_future(fetch_page("v1:0"))
+    try:
+        while next_task is not None and len(all_items) < max_items:
+            try:
+                resp = await next_task
+            except Exception as e:
+                print(f"[Mercari-API] Request failed: {e}")
                 break
+            next_task = None
 
-            item_id = item_data.get("id")
-            if not item_id:
-                continue
-
-            # Skip duplicates in current batch
-            if any(i["source_id"] == item_id for i in all_items):
-                continue
-
-            # Check against existing items
-            if item_id in existing_ids:
-                consecutive_existing += 1
-                if consecutive_existing >= OVERLAP_THRESHOLD:
-                    print(f"[Mercari-API] Found {OVERLAP_THRESHOLD} consecutive existing items, stopping")
-                    return all_items
-                continue
-            else:
-                consecutive_existing = 0
-
-            title = item_data.get("name", f"Item {item_id}")
-            price = item_data.get("price")
-            thumbnails = item_data.get("thumbnails", [])
-            image_url = thumbnails[0] if thumbnails else None
-
-            # Extract category ID
-            cat_id = item_data.get("categoryId")
-            category_id = f"mercari:{cat_id}" if cat_id else None
-
-            # Determine correct URL format - shop items use /shops/product/, regular items use /item/
-            # Regular items: m followed by 11 digits (e.g., m86254101449)
-            # Shop items: any other alphanumeric ID
-            if re.match(r'^m\d{11}$', item_id):
-                item_url = f"{root_product_url}{item_id}"
-            else:
-                item_url = f"https://jp.mercari.com/shops/product/{item_id}"
+            items = resp.get("items", [])
+            if not items:
+                break
 
-            all_items.append({
+            next_page_token = resp.get("meta", {}).get("nextPageToken")
+            if next_page_token:
+                next_task = asyncio.ensure_future(fetch_page(next_page_token))
+
+            # Same prefilter-then-comprehension split as the Yahoo loop
+            _get = dict.get
+            candidates = scan.filter_page(
+                ((iid, (iid, d)) for d in items if (iid := _get(d, "id"))),
+                max_items - len(all_items))
+
+            # URL format: regular items (m + 11 digits, e.g. m86254101449)
+            # use /item/, shop items use /shops/product/
+            page_items = [{
                 "source": "mercari",
-                "source_id": item_id,
-                "url": item_url,
-                "title": title[:200],
-                "price": price,
-                "image_url": image_url,
-                "category_id": category_id,
-            })
+                "source_id": iid,
+                "url": (_MERCARI_ITEM_URL + iid) if _MERCARI_ITEM_RE.match(iid)
+                       else _MERCARI_SHOP_URL + iid,
+                "title": _cap(_get(d, "name", f"Item {iid}")),
+                "price": _get(d, "price"),
+                "image_url": t[0] if (t := _get(d, "thumbnails")) else None,
+                "category_id": f"mercari:{c}" if (c := _get(d, "categoryId")) else None,
+            } for iid, d in candidates]
+            all_items.extend(page_items)
+            _flush_page(save_tasks, page_items, keyword_id)
+
+            if scan.stopped:
+                print(f"[Mercari-API] Found {OVERLAP_THRESHOLD} consecutive existing items, stopping")
+                return all_items
+
+    finally:
+        if next_task is not None:
+            next_task.cancel()
 
     print(f"[Mercari-API] Scraped {len(all_items)} new items")
     return all_items
 
 
 async def scrape_rakuten_fast(keyword: str, max_items: int = 300,
-                               existing_ids: set = None, keyword_id: int = None) -> list:
+                               existing_ids: set = None, keyword_id: int = None,
+                               sem: asyncio.Semaphore = None, save_tasks: list = None) -> list:
     """
     Fast Rakuten (Fril) scraper using direct HTTP requests.
     Parses HTML structure - no browser needed.
     """
     try:
-        import httpx
-        from bs4 import BeautifulSoup
+        import httpx  # noqa: F401 - the shared client below needs it
+        try:
+            import selectolax  # noqa: F401
+        except ImportError:
+            import bs4  # noqa: F401
     except ImportError:
         print("Missing dependencies. Run: pip install httpx beautifulsoup4")
         return []
 
     if existing_ids is None:
-        existing_ids = get_existing_source_ids('rakuten', keyword_id)
+        existing_ids = get_existing_id_filter('rakuten', keyword_id)
 
     all_items = []
-    consecutive_existing = 0
+    scan = _OverlapScan(existing_ids)
 
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept-Language": "ja-JP,ja;q=0.9",
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-    }
+    client = _get_async_client()
+    page_num = 1
+    max_pages = 10
 
-    async with httpx.AsyncClient(headers=headers, follow_redirects=True, timeout=30.0) as client:
-        page_num = 1
-        max_pages = 10
+    print(f"[Rakuten-Fast] Searching: {keyword}")
 
-        print(f"[Rakuten-Fast] Searching: {keyword}")
+    # Politeness comes from bounding concurrent requests, not from an
+    # unconditional sleep per page (which cost ~1s even on success)
+    if sem is None:
+        sem = asyncio.Semaphore(2)
 
-        while page_num <= max_pages and len(all_items) < max_items:
-            # Rakuten (Fril) search URL
-            url = f"https://fril.jp/s?query={quote(keyword)}&sort=1&page={page_num}"
+    async def fetch_page(page):
+        # Rakuten (Fril) search URL
+        url = f"https://fril.jp/s?query={quote(keyword)}&sort=1&page={page}"
+        # Backoff only on retryable failures: 429s and transport errors
+        for attempt in range(3):
+            try:
+                async with sem:
+                    response = await client.get(url)
+            except httpx.TransportError:
+                if attempt == 2:
+                    raise
+            else:
+                if response.status_code != 429 or attempt == 2:
+                    return response
+            await asyncio.sleep(2 ** attempt)
 
+    next_task = asyncio.ensure_future(fetch_page(1))
+    try:
+        while page_num <= max_pages and len(all_items) < max_items:
             try:
-                response = await client.get(url)
+                response = await next_task
+                next_task = None
+
                 if response.status_code != 200:
                     print(f"[Rakuten-Fast] Error: Status {response.status_code}")
                     break
 
-                soup = BeautifulSoup(response.text, "html.parser")
-                items = soup.select("div.item-box")
+                if page_num + 1 <= max_pages:
+                    next_task = asyncio.ensure_future(fetch_page(page_num + 1))
+
+                items = _parse_rakuten_items(response.text)
 
                 if not items:
                     print(f"[Rakuten-Fast] No items on page {page_num}, stopping")
                     break
 
-                for item_div in items:
-                    # Extract item ID from the link
-                    link = item_div.select_one("a.link_search_image, a.link_search_title")
-                    if not link or not link.get("href"):
-                        continue
-
-                    item_url = link["href"]
-                    # Extract item ID from URL like: https://item.fril.jp/f86ec7e80b0df0cedc30ddd1548841b1
-                    item_id_match = re.search(r'/([a-f0-9]{32})', item_url)
-                    if not item_id_match:
-                        continue
-
-                    item_id = item_id_match.group(1)
-
-                    # Check if we already have this item
-                    if item_id in existing_ids:
-                        consecutive_existing += 1
-                        if consecutive_existing >= OVERLAP_THRESHOLD:
-                            print(f"[Rakuten-Fast] Found {consecutive_existing} consecutive existing items, stopping")
-                            return all_items
-                        continue
-
-                    consecutive_existing = 0
-
-                    # Extract title from link title attribute or inner text
-                    title_link = item_div.select_one("a.link_search_title")
-                    if title_link:
-                        # Title is in the title attribute, extract just the item name part
-                        title = title_link.get("title", "")
-                        # The title format is "ITEM NAME BRAND(Brand Name)の..." - extract just item name
-                        if title:
-                            # Take everything before the brand/category suffix
-                            title = title.split("の")[0] if "の" in title else title
-                    if not title:
-                        title = "Untitled"
-
-                    # Extract price from data-content attribute
-                    price_elem = item_div.select_one("p.item-box__item-price span[data-content]")
-                    price = 0
-                    if price_elem:
-                        price_val = price_elem.get("data-content", "")
-                        if price_val.isdigit():
-                            price = int(price_val)
-                    # Fallback to text parsing
-                    if price == 0:
-                        price_elem = item_div.select_one("p.item-box__item-price")
-                        if price_elem:
-                            price_text = price_elem.get_text(strip=True)
-                            price_match = re.search(r'[\d,]+', price_text)
-                            if price_match:
-                                price = int(price_match.group().replace(',', ''))
-
-                    # Extract image - prioritize data-original (real image) over src (placeholder)
-                    img_elem = item_div.select_one("img.img-responsive, img.lazy")
-                    image_url = ""
-                    if img_elem:
-                        # data-original contains the real image URL
-                        image_url = img_elem.get("data-original") or img_elem.get("src") or ""
-                        # Skip if it's the placeholder image
-                        if "item_square_dummy" in image_url:
-                            image_url = ""
-
-                    all_items.append({
-                        "source": "rakuten",
-                        "source_id": item_id,
-                        "url": f"https://item.fril.jp/{item_id}",
-                        "title": title[:200],
-                        "price": price,
-                        "image_url": image_url,
-                        "category_id": None,
-                    })
-
-                await asyncio.sleep(random.uniform(0.5, 1.5))
+                # Same prefilter-then-comprehension split as the Yahoo
+                # loop; ids come from URLs like
+                # https://item.fril.jp/f86ec7e80b0df0cedc30ddd1548841b1
+                candidates = scan.filter_page(
+                    (m.group(1), (m.group(1), e)) for e in items
+                    if (m := _RAKUTEN_ID_RE.search(e["href"])))
+
+                # Title attribute format is "ITEM NAME BRAND(Brand Name)の..."
+                # - keep the item name. data-original holds the real image;
+                # skip the placeholder.
+                page_items = [{
+                    "source": "rakuten",
+                    "source_id": iid,
+                    "url": _FRIL_ITEM_URL + iid,
+                    "title": _cap(e["title"].split("の")[0] or "Untitled"),
+                    "price": _rakuten_price(e),
+                    "image_url": "" if "item_square_dummy" in e["image_url"] else e["image_url"],
+                    "category_id": None,
+                } for iid, e in candidates]
+                all_items.extend(page_items)
+                _flush_page(save_tasks, page_items, keyword_id)
+
+                if scan.stopped:
+                    print(f"[Rakuten-Fast] Found {OVERLAP_THRESHOLD} consecutive existing items, stopping")
+                    return all_items
+
                 page_num += 1
 
             except Exception as e:
                 print(f"[Rakuten-Fast] Error on page {page_num}: {e}")
                 break
 
+    finally:
+        if next_task is not None:
+            next_task.cancel()
+
     print(f"[Rakuten-Fast] Scraped {len(all_items)} new items")
     return all_items
 
 
 async def scrape_keyword_fast(keyword_id: int, keyword: str, source: str = 'all',
-                              max_items: int = 300) -> dict:
+                              max_items: int = 300, sems: dict = None) -> dict:
     """
     Fast async scraper that runs multiple sources in parallel.
     Source can be: 'all', 'both' (legacy), single source, or comma-separated (e.g. 'mercari,yahoo')
+    `sems` optionally maps source name to a shared per-host semaphore so
+    concurrent keywords stay polite to each marketplace.
     """
     all_items = []
+    sems = sems or {}
+
+    # Pages stream into SQLite as they are parsed - the scrapers append
+    # a background save task per page so DB writes overlap the next fetch
+    # and nothing is lost if a later page fails
+    save_tasks = []
 
     # Normalize source - handle comma-separated and legacy 'both'
     if source in ('all', 'both'):
@@ -406,20 +603,26 @@ async def scrape_keyword_fast(keyword_id: int, keyword: str, source: str = 'all'
 
     tasks = []
     if 'mercari' in sources:
-        tasks.append(scrape_mercari_fast(keyword, max_items=max_items, keyword_id=keyword_id))
+        tasks.append(scrape_mercari_fast(keyword, max_items=max_items, keyword_id=keyword_id,
+                                         sem=sems.get('mercari'), save_tasks=save_tasks))
     if 'yahoo' in sources:
-        tasks.append(scrape_yahoo_fast(keyword, max_items=max_items, keyword_id=keyword_id))
+        tasks.append(scrape_yahoo_fast(keyword, max_items=max_items, keyword_id=keyword_id,
+                                       sem=sems.get('yahoo'), save_tasks=save_tasks))
     if 'rakuten' in sources:
-        tasks.append(scrape_rakuten_fast(keyword, max_items=max_items, keyword_id=keyword_id))
+        tasks.append(scrape_rakuten_fast(keyword, max_items=max_items, keyword_id=keyword_id,
+                                         sem=sems.get('rakuten'), save_tasks=save_tasks))
 
     if tasks:
         results = await asyncio.gather(*tasks)
         for result in results:
             all_items.extend(result)
 
-    if all_items:
-        new_count = save_scraped_items(all_items, keyword_id)
-        update_keyword_scraped(keyword_id, new_count)
+    if save_tasks:
+        new_count = sum(await asyncio.gather(*save_tasks))
+        # Bookkeeping runs off-loop like the page saves - the keyword
+        # UPDATE's commit/fsync would otherwise stall every other
+        # keyword sharing this event loop
+        await asyncio.to_thread(update_keyword_scraped, keyword_id, new_count)
         return {"scraped": len(all_items), "saved": new_count}
 
     return {"scraped": 0, "saved": 0}
@@ -428,7 +631,13 @@ async def scrape_keyword_fast(keyword_id: int, keyword: str, source: str = 'all'
 def scrape_keyword_fast_sync(keyword_id: int, keyword: str, source: str = 'both',
                              max_items: int = 300) -> dict:
     """Synchronous wrapper for fast scraping."""
-    return asyncio.run(scrape_keyword_fast(keyword_id, keyword, source, max_items))
+    async def run():
+        try:
+            return await scrape_keyword_fast(keyword_id, keyword, source, max_items)
+        finally:
+            # This loop dies with asyncio.run, taking the sockets with it
+            await close_clients()
+    return asyncio.run(run())
 
 
 # ============== SYNC API SCRAPERS ==============
@@ -438,127 +647,17 @@ def scrape_mercari(keyword: str, max_items: int = 300, headless: bool = True,
                    existing_ids: set = None, keyword_id: int = None) -> list:
     """
     Scrape Mercari Japan for items matching keyword using API.
-    Smart scraping: stops after finding OVERLAP_THRESHOLD consecutive existing items.
-    Returns list of item dicts with JPY prices.
+    Thin sync wrapper over scrape_mercari_fast - one code path for the
+    pagination/overlap logic instead of a blocking duplicate of it.
     """
-    try:
-        import requests
-        from mercari_api import generate_dpop
-    except ImportError:
-        print("Missing mercari package. Run: pip install mercari")
-        return []
-
-    if existing_ids is None:
-        existing_ids = get_existing_source_ids('mercari', keyword_id)
-
-    all_items = []
-    consecutive_existing = 0
-
-    search_url = "https://api.mercari.jp/v2/entities:search"
-    root_product_url = "https://jp.mercari.com/item/"
-
-    print(f"[Mercari] Searching: {keyword}")
-
-    page_token = "v1:0"
-    has_next_page = True
-
-    with tqdm(total=max_items, desc="[Mercari]") as pbar:
-        while has_next_page and len(all_items) < max_items:
-            dpop = generate_dpop(uuid="Mercari Python Bot", method="POST", url=search_url)
-
-            headers = {
-                'DPOP': dpop,
-                'X-Platform': 'web',
-                'Accept': '*/*',
-                'Accept-Encoding': 'deflate, gzip',
-                'Content-Type': 'application/json; charset=utf-8',
-                'User-Agent': 'python-mercari',
-            }
-
-            data = {
-                "userId": f"SCRAPER_{random.randint(10000, 99999)}",
-                "pageSize": 120,
-                "pageToken": page_token,
-                "searchSessionId": f"SCRAPER_{random.randint(10000, 99999)}",
-                "indexRouting": "INDEX_ROUTING_UNSPECIFIED",
-                "searchCondition": {
-                    "keyword": keyword,
-                    "sort": "SORT_CREATED_TIME",
-                    "order": "ORDER_DESC",
-                    "status": ["STATUS_ON_SALE"],
-                },
-                "withAuction": True,
-                "defaultDatasets": ["DATASET_TYPE_MERCARI", "DATASET_TYPE_BEYOND"]
-            }
-
-            try:
-                r = requests.post(search_url, headers=headers, json=data, timeout=30)
-                r.raise_for_status()
-                resp = r.json()
-            except Exception as e:
-                print(f"[Mercari] Request failed: {e}")
-                break
-
-            items = resp.get("items", [])
-            if not items:
-                break
-
-            next_page_token = resp.get("meta", {}).get("nextPageToken")
-            has_next_page = bool(next_page_token)
-            page_token = next_page_token
-
-            for item_data in items:
-                if len(all_items) >= max_items:
-                    break
-
-                item_id = item_data.get("id")
-                if not item_id:
-                    continue
-
-                # Skip duplicates in current batch
-                if any(i["source_id"] == item_id for i in all_items):
-                    continue
-
-                # Check against existing items
-                if item_id in existing_ids:
-                    consecutive_existing += 1
-                    if consecutive_existing >= OVERLAP_THRESHOLD:
-                        print(f"[Mercari] Found {OVERLAP_THRESHOLD} consecutive existing items, stopping")
-                        return all_items
-                    continue
-                else:
-                    consecutive_existing = 0
-
-                title = item_data.get("name", f"Item {item_id}")
-                price = item_data.get("price")
-                thumbnails = item_data.get("thumbnails", [])
-                image_url = thumbnails[0] if thumbnails else None
-
-                # Extract category ID
-                cat_id = item_data.get("categoryId")
-                category_id = f"mercari:{cat_id}" if cat_id else None
-
-                # Determine correct URL format - shop items use /shops/product/, regular items use /item/
-                # Regular items: m followed by 11 digits (e.g., m86254101449)
-                # Shop items: any other alphanumeric ID
-                if re.match(r'^m\d{11}$', item_id):
-                    item_url = f"{root_product_url}{item_id}"
-                else:
-                    item_url = f"https://jp.mercari.com/shops/product/{item_id}"
-
-                all_items.append({
-                    "source": "mercari",
-                    "source_id": item_id,
-                    "url": item_url,
-                    "title": title[:200],
-                    "price": price,
-                    "image_url": image_url,
-                    "category_id": category_id,
-                })
-                pbar.update(1)
-
-    print(f"[Mercari] Scraped {len(all_items)} new items")
-    return all_items
+    async def run():
+        try:
+            return await scrape_mercari_fast(keyword, max_items=max_items,
+                                             existing_ids=existing_ids,
+                                             keyword_id=keyword_id)
+        finally:
+            await close_clients()
+    return asyncio.run(run())
 
 
 # LEGACY: Playwright-based Yahoo scraper - commented out, using HTTP scraper instead
@@ -586,14 +685,33 @@ def scrape_all_keywords(max_items_per_source: int = 300) -> dict:
         print("No keywords to scrape. Add keywords first.")
         return {"total_scraped": 0, "total_saved": 0}
 
-    total_scraped = 0
-    total_saved = 0
+    # One event loop for the whole run so warm connections carry over
+    # from keyword to keyword instead of dying with each asyncio.run
+    return asyncio.run(_scrape_all_keywords_async(keywords, max_items_per_source))
 
-    for kw in keywords:
+
+async def _scrape_all_keywords_async(keywords: list, max_items_per_source: int) -> dict:
+    # All keywords run concurrently; per-host semaphores keep the total
+    # in-flight requests to each marketplace bounded regardless of how
+    # many keywords are configured
+    sems = {
+        'yahoo': asyncio.Semaphore(4),
+        'mercari': asyncio.Semaphore(4),
+        'rakuten': asyncio.Semaphore(2),
+    }
+
+    async def run_one(kw):
         print(f"\n=== Scraping keyword: {kw['keyword']} (source: {kw['source']}) ===")
-        result = scrape_keyword(kw['id'], kw['keyword'], kw['source'], max_items_per_source)
-        total_scraped += result['scraped']
-        total_saved += result['saved']
+        return await scrape_keyword_fast(kw['id'], kw['keyword'], kw['source'],
+                                         max_items_per_source, sems=sems)
+
+    try:
+        results = await asyncio.gather(*(run_one(kw) for kw in keywords))
+    finally:
+        await close_clients()
+
+    total_scraped = sum(r['scraped'] for r in results)
+    total_saved = sum(r['saved'] for r in results)
 
     print(f"\n=== Total: {total_scraped} scraped, {total_saved} new items saved ===")
     return {"total_scraped": total_scraped, "total_saved": total_saved}
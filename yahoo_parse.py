@@ -0,0 +1,144 @@
+"""
+Hot-path parser for Yahoo Auctions search result pages.
+
+Extracted from scraper.py so the one CPU-bound inner routine can be
+compiled to a C extension (`mypyc yahoo_parse.py` or
+`cythonize -3 --inplace yahoo_parse.py`) without touching the rest of
+the scraper - Python imports the .so ahead of this file when present.
+The function is written against plain types (str in, tuples out) and
+full annotations so it compiles as-is; interpreted, it behaves
+identically.
+"""
+
+import re
+from html import unescape
+from typing import List, Optional, Tuple
+
+# (auction_id, title, image_url, price, category)
+YahooProduct = Tuple[str, str, Optional[str], Optional[int], Optional[str]]
+
+# Regex fast path: every item is an anchor carrying inline data-auction-*
+# attributes, so a linear scan of the raw text is enough - no DOM needed.
+# Matching the tag first and the attributes second keeps it independent
+# of attribute order.
+_TAG_RE = re.compile(r'<a\b[^>]*?data-auction-id="[^"]+"[^>]*>')
+_ATTR_RE = re.compile(r'data-auction-(id|title|img|price|category)="([^"]*)"')
+
+
+def _to_int(s: Optional[str]) -> Optional[int]:
+    try:
+        return int(s) if s else None
+    except ValueError:
+        return None
+
+
+def parse_yahoo_page(html: str) -> List[YahooProduct]:
+    """Field tuples, one per auction id, for a Yahoo results page.
+
+    Tries the regex scan first; if the markup shifted enough that it
+    matches nothing, falls back to a real HTML parse.
+    """
+    # A product card renders several anchors (image link, title link)
+    # that all carry data-auction-id, where the DOM path's selector
+    # matched only the image link. Merge anchors by id - first-seen
+    # order, missing attributes filled from later anchors - so exactly
+    # one tuple per product reaches the scrape loop's overlap counter.
+    merged = {}
+    for tag in _TAG_RE.finditer(html):
+        attrs = dict(_ATTR_RE.findall(tag.group()))
+        auction_id = attrs.get('id')
+        if not auction_id:
+            continue
+        prev = merged.get(auction_id)
+        if prev is None:
+            merged[auction_id] = attrs
+        else:
+            for key, value in attrs.items():
+                if value and not prev.get(key):
+                    prev[key] = value
+
+    out: List[YahooProduct] = []
+    for auction_id, attrs in merged.items():
+        title = attrs.get('title')
+        img = attrs.get('img')
+        out.append((
+            auction_id,
+            unescape(title) if title else 'Auction ' + auction_id,
+            unescape(img) if img else None,
+            _to_int(attrs.get('price')),
+            attrs.get('category') or None,
+        ))
+    if out:
+        return out
+    return _parse_yahoo_page_dom(html)
+
+
+def _parse_yahoo_page_dom(html: str) -> List[YahooProduct]:
+    """DOM-based fallback when the regex scan finds nothing."""
+    try:
+        from selectolax.parser import HTMLParser
+    except ImportError:
+        return _parse_yahoo_page_soup(html)
+
+    tree = HTMLParser(html)
+    nodes = tree.css('a.Product__imageLink[data-auction-id]')
+    if not nodes:
+        # Try alternative selector
+        nodes = tree.css('[data-auction-id]')
+
+    out: List[YahooProduct] = []
+    for node in nodes:
+        attrs = node.attributes
+        auction_id = attrs.get('data-auction-id')
+        if not auction_id:
+            continue
+        out.append((
+            auction_id,
+            attrs.get('data-auction-title') or 'Auction ' + auction_id,
+            attrs.get('data-auction-img'),
+            _to_int(attrs.get('data-auction-price')),
+            attrs.get('data-auction-category'),
+        ))
+    return out
+
+
+# Compiled soupsieve selectors for the bs4 fallback, built once on
+# first use - soup.select() re-tokenizes its selector string per call
+_soup_sel = None
+
+
+def _soup_selectors():
+    global _soup_sel
+    if _soup_sel is None:
+        import soupsieve
+        _soup_sel = (
+            soupsieve.compile('a.Product__imageLink[data-auction-id]'),
+            soupsieve.compile('[data-auction-id]'),
+        )
+    return _soup_sel
+
+
+def _parse_yahoo_page_soup(html: str) -> List[YahooProduct]:
+    """BeautifulSoup fallback for environments without selectolax."""
+    from bs4 import BeautifulSoup
+
+    product_sel, any_sel = _soup_selectors()
+    soup = BeautifulSoup(html, 'html.parser')
+    products = product_sel.select(soup)
+    if not products:
+        products = any_sel.select(soup)
+
+    out: List[YahooProduct] = []
+    for p in products:
+        attrs = p.attrs
+        auction_id = attrs.get('data-auction-id')
+        if not auction_id:
+            continue
+        out.append((
+            auction_id,
+            attrs.get('data-auction-title') or 'Auction ' + auction_id,
+            attrs.get('data-auction-img'),
+            _to_int(attrs.get('data-auction-price')),
+            attrs.get('data-auction-category'),
+        ))
+    return out